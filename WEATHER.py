@@ -1,6 +1,9 @@
 # WEATHER.py
 import os
-import requests
+import httpx
+import orjson
+from cachetools import TTLCache
+from contextlib import asynccontextmanager
 from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
 
@@ -8,10 +11,36 @@ from dotenv import load_dotenv
 load_dotenv()
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
 
-mcp = FastMCP("Weather_Server")
+WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+BASE_PARAMS = {"appid": OPENWEATHER_API_KEY, "units": "metric"}
+
+# Shared async client so concurrent lookups reuse pooled keep-alive connections
+_client = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    ),
+    timeout=5.0
+)
+
+# Recent results keyed on normalized city name; weather rarely changes within a minute
+_weather_cache = TTLCache(maxsize=512, ttl=60)
+
+
+@asynccontextmanager
+async def lifespan(server):
+    """Close the shared HTTP client when the server shuts down"""
+    try:
+        yield
+    finally:
+        await _client.aclose()
+
+
+mcp = FastMCP("Weather_Server", lifespan=lifespan)
 
 @mcp.tool()
-def get_weather(city: str) -> str:
+async def get_weather(city: str) -> str:
     """
     Returns the current weather for a given city using OpenWeatherMap API.
     Example: get_weather("Delhi")
@@ -19,11 +48,14 @@ def get_weather(city: str) -> str:
     if not OPENWEATHER_API_KEY:
         return "Error: OPENWEATHER_API_KEY not set in environment."
 
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_API_KEY}&units=metric"
+    cache_key = city.strip().lower()
+    cached = _weather_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
     try:
-        response = requests.get(url, timeout=5)
-        data = response.json()
+        response = await _client.get(WEATHER_URL, params={**BASE_PARAMS, "q": city})
+        data = orjson.loads(response.content)
 
         if response.status_code != 200:
             return f"Error fetching weather: {data.get('message', 'Unknown error')}"
@@ -33,7 +65,9 @@ def get_weather(city: str) -> str:
         condition = data["weather"][0]["description"].capitalize()
         humidity = data["main"]["humidity"]
 
-        return f"Weather in {city_name}: {condition}, {temp}°C, Humidity {humidity}%"
+        result = f"Weather in {city_name}: {condition}, {temp}°C, Humidity {humidity}%"
+        _weather_cache[cache_key] = result
+        return result
 
     except Exception as e:
         return f"Error: {str(e)}"
@@ -1,10 +1,178 @@
 from mcp.server.fastmcp import FastMCP
+import ast
 import math
+import operator
 import re
-from typing import Union
+import numexpr
+import numpy as np
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Union
+
+# GMP's factorial is several times faster than math.factorial for large n
+try:
+    from gmpy2 import fac as _fac
+except ImportError:
+    _fac = math.factorial
 
 mcp = FastMCP("math")
 
+# Read-only namespace of math functions and constants available to calculate()
+_SAFE_NAMES = MappingProxyType({
+    # Math functions
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'asin': math.asin,
+    'acos': math.acos,
+    'atan': math.atan,
+    'atan2': math.atan2,
+    'sinh': math.sinh,
+    'cosh': math.cosh,
+    'tanh': math.tanh,
+    'sqrt': math.sqrt,
+    'log': math.log,
+    'log10': math.log10,
+    'log2': math.log2,
+    'exp': math.exp,
+    'abs': abs,
+    'pow': pow,
+    'ceil': math.ceil,
+    'floor': math.floor,
+    'round': round,
+    'max': max,
+    'min': min,
+    'sum': sum,
+    'factorial': math.factorial,
+    'gcd': math.gcd,
+    'lcm': math.lcm,
+    'degrees': math.degrees,
+    'radians': math.radians,
+    # Constants
+    'pi': math.pi,
+    'e': math.e,
+    'tau': math.tau,
+    'inf': math.inf,
+    'nan': math.nan,
+})
+
+
+# Operators allowed in calculate() expressions
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+# numexpr has no floor division, so calculate_array() leaves it out on both paths
+_ARRAY_BIN_OPS = {op: fn for op, fn in _BIN_OPS.items() if op is not ast.FloorDiv}
+
+_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+# A bare number, or one +, -, *, / between two numbers: the most common agent
+# inputs, answered without parsing
+_SIMPLE_EXPR = re.compile(r"(-?\d+(?:\.\d+)?)(?:\s*([-+*/])\s*(-?\d+(?:\.\d+)?))?")
+
+_SIMPLE_OPS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+}
+
+
+def _to_number(text: str) -> Union[int, float]:
+    """Convert a numeric literal with the same int/float typing Python uses"""
+    return float(text) if '.' in text else int(text)
+
+
+def _validate(node: ast.AST, names=_SAFE_NAMES, bin_ops=_BIN_OPS) -> None:
+    """Reject any syntax outside plain arithmetic on whitelisted names"""
+    if isinstance(node, ast.Constant):
+        if not isinstance(node.value, (int, float, complex)) or isinstance(node.value, bool):
+            raise ValueError(f"Unsupported constant: {node.value!r}")
+    elif isinstance(node, ast.Name):
+        if node.id not in names:
+            raise NameError(f"name '{node.id}' is not defined")
+    elif isinstance(node, ast.BinOp):
+        if type(node.op) not in bin_ops:
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        _validate(node.left, names, bin_ops)
+        _validate(node.right, names, bin_ops)
+    elif isinstance(node, ast.UnaryOp):
+        if type(node.op) not in _UNARY_OPS:
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        _validate(node.operand, names, bin_ops)
+    elif isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.keywords:
+            raise ValueError("Only plain calls to supported functions are allowed")
+        _validate(node.func, names, bin_ops)
+        for arg in node.args:
+            _validate(arg, names, bin_ops)
+    elif isinstance(node, (ast.List, ast.Tuple)):
+        for elt in node.elts:
+            _validate(elt, names, bin_ops)
+    else:
+        raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+
+
+@lru_cache(maxsize=1024)
+def _parse(expression: str) -> ast.AST:
+    """Parse and validate an expression once, reusing the tree on repeat calls"""
+    tree = ast.parse(expression.strip(), mode="eval")
+    _validate(tree.body)
+    return tree.body
+
+
+def _eval(node: ast.AST, names=_SAFE_NAMES):
+    """Evaluate a validated expression tree"""
+    return _EVALUATORS[type(node)](node, names)
+
+
+_EVALUATORS = {
+    ast.Constant: lambda node, names: node.value,
+    ast.Name: lambda node, names: names[node.id],
+    ast.BinOp: lambda node, names: _BIN_OPS[type(node.op)](_eval(node.left, names), _eval(node.right, names)),
+    ast.UnaryOp: lambda node, names: _UNARY_OPS[type(node.op)](_eval(node.operand, names)),
+    ast.Call: lambda node, names: names[node.func.id](*[_eval(arg, names) for arg in node.args]),
+    ast.List: lambda node, names: [_eval(elt, names) for elt in node.elts],
+    ast.Tuple: lambda node, names: tuple(_eval(elt, names) for elt in node.elts),
+}
+
+# Element-wise functions and constants available to calculate_array(); the
+# names match what numexpr understands so both evaluation paths agree
+_ARRAY_NAMES = MappingProxyType({
+    'sin': np.sin,
+    'cos': np.cos,
+    'tan': np.tan,
+    'arcsin': np.arcsin,
+    'arccos': np.arccos,
+    'arctan': np.arctan,
+    'arctan2': np.arctan2,
+    'sinh': np.sinh,
+    'cosh': np.cosh,
+    'tanh': np.tanh,
+    'sqrt': np.sqrt,
+    'log': np.log,
+    'log10': np.log10,
+    'exp': np.exp,
+    'abs': np.abs,
+    'pi': math.pi,
+    'e': math.e,
+})
+
+# Below this many elements numexpr's setup cost outweighs its speedup
+_NUMEXPR_MIN_SIZE = 256
+
+
 @mcp.tool()
 def calculate(expression: str) -> Union[float, int, str]:
     """
@@ -31,47 +199,15 @@ def calculate(expression: str) -> Union[float, int, str]:
         The calculated result or an error message
     """
     try:
-        # Create a safe namespace with math functions
-        safe_dict = {
-            # Math functions
-            'sin': math.sin,
-            'cos': math.cos,
-            'tan': math.tan,
-            'asin': math.asin,
-            'acos': math.acos,
-            'atan': math.atan,
-            'atan2': math.atan2,
-            'sinh': math.sinh,
-            'cosh': math.cosh,
-            'tanh': math.tanh,
-            'sqrt': math.sqrt,
-            'log': math.log,
-            'log10': math.log10,
-            'log2': math.log2,
-            'exp': math.exp,
-            'abs': abs,
-            'pow': pow,
-            'ceil': math.ceil,
-            'floor': math.floor,
-            'round': round,
-            'max': max,
-            'min': min,
-            'sum': sum,
-            'factorial': math.factorial,
-            'gcd': math.gcd,
-            'lcm': math.lcm,
-            'degrees': math.degrees,
-            'radians': math.radians,
-            # Constants
-            'pi': math.pi,
-            'e': math.e,
-            'tau': math.tau,
-            'inf': math.inf,
-            'nan': math.nan,
-        }
-        
-        # Evaluate the expression safely
-        result = eval(expression, {"__builtins__": {}}, safe_dict)
+        simple = _SIMPLE_EXPR.fullmatch(expression.strip())
+        if simple:
+            left, op, right = simple.groups()
+            result = _to_number(left)
+            if op:
+                result = _SIMPLE_OPS[op](result, _to_number(right))
+        else:
+            # Evaluate the pre-parsed expression tree (no eval involved)
+            result = _eval(_parse(expression))
         
         # Return as int if it's a whole number, otherwise float
         if isinstance(result, float) and result.is_integer():
@@ -92,6 +228,55 @@ def calculate(expression: str) -> Union[float, int, str]:
         return f"Error: {str(e)}"
 
 
+@mcp.tool()
+def calculate_array(expression: str, variables: Dict[str, List[float]]) -> Union[List[float], str]:
+    """
+    Evaluates a mathematical expression element-wise over arrays of values.
+    
+    Supports +, -, *, /, %, ** and the functions sin, cos, tan, arcsin, arccos,
+    arctan, arctan2, sinh, cosh, tanh, sqrt, log, log10, exp, abs.
+    Large arrays are evaluated with NumExpr, small ones with NumPy.
+    
+    Examples:
+    - calculate_array("sqrt(x**2 + y**2)", {"x": [3, 5], "y": [4, 12]})
+    - calculate_array("price * qty * 1.18", {"price": [10, 20], "qty": [2, 3]})
+    
+    Args:
+        expression: A mathematical expression using the variable names
+        variables: Mapping of variable name to a list of numbers (equal lengths)
+        
+    Returns:
+        List of results, one per element, or an error message
+    """
+    try:
+        arrays = {name: np.asarray(values, dtype=float) for name, values in variables.items()}
+        names = {**_ARRAY_NAMES, **arrays}
+        
+        tree = ast.parse(expression.strip(), mode="eval")
+        _validate(tree.body, names, _ARRAY_BIN_OPS)
+        
+        # Both paths yield inf/nan instead of raising, so bad elements are caught below
+        with np.errstate(all="ignore"):
+            if any(arr.size > _NUMEXPR_MIN_SIZE for arr in arrays.values()):
+                result = numexpr.evaluate(expression, local_dict=names, global_dict={})
+            else:
+                result = _eval(tree.body, names)
+        
+        result = np.atleast_1d(result)
+        if not np.isfinite(result).all():
+            return "Error: Division by zero or value outside a function's domain"
+        return result.tolist()
+        
+    except ZeroDivisionError:
+        return "Error: Division by zero"
+    except SyntaxError:
+        return "Error: Invalid syntax in expression"
+    except NameError as e:
+        return f"Error: Unknown function or variable - {str(e)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
 @mcp.tool()
 def multiply(a: int, b: int) -> int:
     """
@@ -200,7 +385,7 @@ def factorial(n: int) -> Union[int, str]:
         return "Error: Factorial not defined for negative numbers"
     if n > 1000:
         return "Error: Number too large for factorial calculation"
-    return math.factorial(n)
+    return int(_fac(n))
 
 
 @mcp.tool()
@@ -219,25 +404,27 @@ def solve_quadratic(a: float, b: float, c: float) -> Union[dict, str]:
     if a == 0:
         return "Error: 'a' cannot be zero in a quadratic equation"
     
-    discriminant = b**2 - 4*a*c
+    discriminant = b*b - 4*a*c
+    two_a = 2*a
     
     if discriminant > 0:
-        x1 = (-b + math.sqrt(discriminant)) / (2*a)
-        x2 = (-b - math.sqrt(discriminant)) / (2*a)
+        root = math.sqrt(discriminant)
+        x1 = (-b + root) / two_a
+        x2 = (-b - root) / two_a
         return {
             "solution_type": "Two real solutions",
             "x1": x1,
             "x2": x2
         }
     elif discriminant == 0:
-        x = -b / (2*a)
+        x = -b / two_a
         return {
             "solution_type": "One real solution",
             "x": x
         }
     else:
-        real_part = -b / (2*a)
-        imaginary_part = math.sqrt(abs(discriminant)) / (2*a)
+        real_part = -b / two_a
+        imaginary_part = math.sqrt(-discriminant) / two_a
         return {
             "solution_type": "Two complex solutions",
             "x1": f"{real_part} + {imaginary_part}i",
@@ -245,6 +432,58 @@ def solve_quadratic(a: float, b: float, c: float) -> Union[dict, str]:
         }
 
 
+@mcp.tool()
+def solve_quadratic_batch(a: List[float], b: List[float], c: List[float]) -> Union[List[Union[dict, str]], str]:
+    """
+    Solves many quadratic equations ax² + bx + c = 0 in one vectorized pass.
+    
+    Args:
+        a: Coefficients of x², one per equation
+        b: Coefficients of x, one per equation
+        c: Constant terms, one per equation
+        
+    Returns:
+        List with one solution dictionary (or error message) per equation,
+        in the same format as solve_quadratic
+    """
+    if not (len(a) == len(b) == len(c)):
+        return "Error: a, b and c must have the same length"
+    
+    a_arr = np.asarray(a, dtype=float)
+    b_arr = np.asarray(b, dtype=float)
+    c_arr = np.asarray(c, dtype=float)
+    
+    discriminant = b_arr*b_arr - 4*a_arr*c_arr
+    two_a = 2*a_arr
+    with np.errstate(divide='ignore', invalid='ignore'):
+        real_part = -b_arr / two_a
+        offset = np.sqrt(np.abs(discriminant)) / two_a
+    
+    results = []
+    for a_i, d, real, off in zip(a_arr.tolist(), discriminant.tolist(), real_part.tolist(), offset.tolist()):
+        if a_i == 0:
+            results.append("Error: 'a' cannot be zero in a quadratic equation")
+        elif d > 0:
+            results.append({
+                "solution_type": "Two real solutions",
+                "x1": real + off,
+                "x2": real - off
+            })
+        elif d == 0:
+            results.append({
+                "solution_type": "One real solution",
+                "x": real
+            })
+        else:
+            results.append({
+                "solution_type": "Two complex solutions",
+                "x1": f"{real} + {off}i",
+                "x2": f"{real} - {off}i"
+            })
+    
+    return results
+
+
 @mcp.tool()
 def percentage(value: float, total: float) -> Union[float, str]:
     """
@@ -262,6 +501,19 @@ def percentage(value: float, total: float) -> Union[float, str]:
     return (value / total) * 100
 
 
+# Functions accepted by trigonometry(), keyed on lowercase name
+_TRIG_FUNCTIONS = {
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'asin': math.asin,
+    'acos': math.acos,
+    'atan': math.atan
+}
+
+_INVERSE_TRIG = frozenset({'asin', 'acos', 'atan'})
+
+
 @mcp.tool()
 def trigonometry(function: str, angle: float, unit: str = "radians") -> Union[float, str]:
     """
@@ -276,25 +528,19 @@ def trigonometry(function: str, angle: float, unit: str = "radians") -> Union[fl
         The calculated trigonometric value or error message
     """
     try:
-        if unit.lower() == "degrees":
-            angle = math.radians(angle)
-        
-        functions = {
-            'sin': math.sin,
-            'cos': math.cos,
-            'tan': math.tan,
-            'asin': math.asin,
-            'acos': math.acos,
-            'atan': math.atan
-        }
-        
-        if function.lower() not in functions:
+        name = function.lower()
+        fn = _TRIG_FUNCTIONS.get(name)
+        if fn is None:
             return f"Error: Unknown function '{function}'. Use: sin, cos, tan, asin, acos, atan"
         
-        result = functions[function.lower()](angle)
+        in_degrees = unit.lower() == "degrees"
+        if in_degrees:
+            angle = math.radians(angle)
+        
+        result = fn(angle)
         
         # For inverse trig functions, convert back to degrees if requested
-        if unit.lower() == "degrees" and function.lower() in ['asin', 'acos', 'atan']:
+        if in_degrees and name in _INVERSE_TRIG:
             result = math.degrees(result)
             
         return result
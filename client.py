@@ -3,6 +3,7 @@ from langgraph.prebuilt import create_react_agent
 from langchain_groq import ChatGroq
 from dotenv import load_dotenv
 import asyncio
+import httpx
 import os
 
 load_dotenv()
@@ -11,53 +12,55 @@ async def main():
     print("🚀 Starting MCP Agent...")
     
     # Initialize MCP client with stdio transport for both servers
+    # Servers are launched with -m so Python reuses their cached bytecode from
+    # __pycache__ instead of recompiling each script on every start.
     print("📡 Configuring MCP servers...")
     client = MultiServerMCPClient(
             {
                 "math": {
                     "command": "python",
-                    "args": ["calculation_server.py"],
+                    "args": ["-m", "calculation_server"],
                     "transport": "stdio"
                 },
                 "Weather_server": {
                     "command": "python",
-                    "args": ["WEATHER.py"],
+                    "args": ["-m", "WEATHER"],
                     "transport": "stdio"
                 },
                 "gmail-mcp-server":{
                     "command":"python",
-                    "args":["gmail_server.py"],
+                    "args":["-m", "gmail_server"],
                     "transport":"stdio"
 
                 },
                 "search_tools":{
                     "command":"python",
-                    "args":["search_server.py"],
+                    "args":["-m", "search_server"],
                     "transport":"stdio"
                 },
                 "google-workspace":{
                     "command":"python",
-                    "args":["drive_calander_server.py"],
+                    "args":["-m", "drive_calander_server"],
                     "transport":"stdio"
                 },
                 "openstreetmap":{
                     "command":"python",
-                    "args":["map_server.py"],
+                    "args":["-m", "map_server"],
                     "transport":"stdio"
                 },
                 "github":{
                     "command":"python",
-                    "args":["github_server.py"],
+                    "args":["-m", "github_server"],
                     "transport":"stdio"
                 },
                 "sqlite-db":{
                     "command":"python",
-                    "args":["sql_server.py"],
+                    "args":["-m", "sql_server"],
                     "transport":"stdio"
                 },
                 "oogle-sheets-robotics":{
                     "command":"python",
-                    "args":["robo_club_server.py"],
+                    "args":["-m", "robo_club_server"],
                     "transport":"stdio"
 
                 }
@@ -68,36 +71,51 @@ async def main():
       )
     
 
-    tools = await client.get_tools()
+    # Start every server and load its tools concurrently rather than one by one
+    server_tools = await asyncio.gather(
+        *(client.get_tools(server_name=name) for name in client.connections)
+    )
+    tools = [tool for batch in server_tools for tool in batch]
     
     groq_api_key = os.getenv("GROQ_API_KEY")
-    llm = ChatGroq(
-        model="llama-3.1-8b-instant",
-        api_key=groq_api_key,
-        temperature=0,
-    )
+    # One keep-alive HTTP/2 pool for the whole session so each turn reuses the
+    # TLS connection to the Groq API instead of handshaking again; closed on
+    # any exit, including Ctrl+C or EOF at the prompt
+    async with httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+        timeout=30.0
+    ) as groq_http_client:
+        llm = ChatGroq(
+            model="llama-3.1-8b-instant",
+            api_key=groq_api_key,
+            temperature=0,
+            http_async_client=groq_http_client,
+        )
 
-    agent = create_react_agent(llm, tools)
+        agent = create_react_agent(llm, tools)
 
-    while True:
-        user_input = input("You: ")
+        while True:
+            # Read input off the event loop so MCP subprocess I/O keeps flowing
+            user_input = await asyncio.to_thread(input, "You: ")
 
-        # exit condition
-        if user_input.lower() in ["bye", "exit", "quit"]:
-            print("Chatbot: Goodbye! 👋")
-            break
+            # exit condition
+            if user_input.lower() in ["bye", "exit", "quit"]:
+                print("Chatbot: Goodbye! 👋")
+                break
 
     
-        try:
-            ai_response = await agent.ainvoke(
-                {"messages": [{"role": "user", "content": user_input}]}
-            )
-            print("\n AI Response:")
-            print(ai_response['messages'][-1].content)
-        except Exception as e:
-            print(f"❌ Error in math query: {e}")
-            import traceback
-            traceback.print_exc()
+            try:
+                ai_response = await agent.ainvoke(
+                    {"messages": [{"role": "user", "content": user_input}]}
+                )
+                print("\n AI Response:")
+                print(ai_response['messages'][-1].content)
+            except Exception as e:
+                print(f"❌ Error in math query: {e}")
+                import traceback
+                traceback.print_exc()
+
 
 if __name__ == "__main__":
     try:
@@ -1,13 +1,17 @@
 from mcp.server.fastmcp import FastMCP
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from google.auth.exceptions import RefreshError
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+from googleapiclient.http import build_http
+from google_auth_httplib2 import AuthorizedHttp
 import os
 import pickle
-import io
-from datetime import datetime, timedelta
+import codecs
+import asyncio
+import functools
+import threading
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Union, Optional
 import json
 
@@ -19,22 +23,90 @@ SCOPES = [
     'https://www.googleapis.com/auth/calendar'
 ]
 
-# Token file path
-TOKEN_FILE = 'token.pickle'
+# Token file path; kept separate from the Gmail scripts' token.json since the scopes differ
+TOKEN_FILE = 'workspace_token.json'
+LEGACY_TOKEN_FILE = 'token.pickle'
 CREDENTIALS_FILE = 'credentials.json'
 
 
+# Serializes token loading/refreshing across tool calls running in worker threads
+_credentials_lock = threading.Lock()
+
+# Credentials reused across calls; only reloaded or refreshed when no longer valid,
+# or when the token file on disk has been replaced since it was last read
+_creds = None
+_creds_mtime = None
+
+# httplib2 (used by googleapiclient) is not thread-safe, so each worker thread
+# keeps its own built service objects
+_services = threading.local()
+
+
+def run_in_thread(func):
+    """
+    Runs a blocking Google API tool in a worker thread so the FastMCP event
+    loop keeps serving other tool calls while the HTTPS round-trip is in flight.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return wrapper
+
+
 def get_credentials():
     """
     Handles OAuth 2.0 authentication for Google APIs.
     Returns valid credentials or initiates OAuth flow if needed.
     """
-    creds = None
+    global _creds, _creds_mtime
+    # Fast path: valid cached credentials need no lock. Otherwise the first
+    # caller through the lock refreshes and the threads queued behind it
+    # reuse the result instead of each POSTing to the token endpoint.
+    creds = _creds
+    if creds is not None and creds.valid and _token_mtime() == _creds_mtime:
+        return creds
     
-    # Check if token.pickle exists with saved credentials
-    if os.path.exists(TOKEN_FILE):
-        with open(TOKEN_FILE, 'rb') as token:
+    with _credentials_lock:
+        if _creds is not None and _token_mtime() != _creds_mtime:
+            _creds = None
+        if _creds is None or not _creds.valid:
+            try:
+                _creds = _load_credentials(_creds)
+            except RefreshError:
+                # Drop the stale token so the next call starts from disk again
+                _creds = None
+                raise
+            _creds_mtime = _token_mtime()
+        return _creds
+
+
+def _token_mtime():
+    """Returns the token file's modification time, or None if it does not exist"""
+    try:
+        return os.stat(TOKEN_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _save_credentials(creds):
+    """Writes the token file atomically so a concurrent reader never sees a partial file"""
+    tmp_file = f"{TOKEN_FILE}.tmp"
+    with open(tmp_file, 'w') as token:
+        token.write(creds.to_json())
+    os.replace(tmp_file, TOKEN_FILE)
+
+
+def _load_credentials(creds=None):
+    """Loads, refreshes or creates credentials; callers must hold _credentials_lock"""
+    # Check if the token file exists with saved credentials
+    if creds is None and os.path.exists(TOKEN_FILE):
+        creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+    elif creds is None and os.path.exists(LEGACY_TOKEN_FILE):
+        # One-time migration of a token saved by older versions of this server
+        with open(LEGACY_TOKEN_FILE, 'rb') as token:
             creds = pickle.load(token)
+        _save_credentials(creds)
+        os.remove(LEGACY_TOKEN_FILE)
     
     # If no valid credentials, let user log in
     if not creds or not creds.valid:
@@ -43,20 +115,131 @@ def get_credentials():
         else:
             if not os.path.exists(CREDENTIALS_FILE):
                 return None
+            # Only needed for the first-run browser login, so not imported at startup
+            from google_auth_oauthlib.flow import InstalledAppFlow
             flow = InstalledAppFlow.from_client_secrets_file(
                 CREDENTIALS_FILE, SCOPES)
             creds = flow.run_local_server(port=0)
         
         # Save credentials for future use
-        with open(TOKEN_FILE, 'wb') as token:
-            pickle.dump(creds, token)
+        _save_credentials(creds)
     
     return creds
 
 
+def get_service(api: str, version: str):
+    """
+    Returns an authorized API client for the current thread, built once and
+    reused until the credentials object changes. Returns None without credentials.
+    All APIs on a thread share one HTTP connection pool, so Drive and Calendar
+    calls reuse the same keep-alive TLS connection to googleapis.com.
+    """
+    creds = get_credentials()
+    if not creds:
+        return None
+    
+    if getattr(_services, 'creds', None) is not creds:
+        _services.creds = creds
+        _services.http = AuthorizedHttp(creds, http=build_http())
+        _services.cache = {}
+    
+    service = _services.cache.get((api, version))
+    if service is None:
+        service = _services.cache[(api, version)] = build(
+            api, version, http=_services.http,
+            cache_discovery=False, static_discovery=True)
+    return service
+
+
+def to_rfc3339(dt: datetime) -> str:
+    """
+    Formats a datetime as the UTC timestamp the Calendar API expects.
+    Naive datetimes are taken to be UTC, matching the events this server creates.
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z')
+
+
+def event_time(when: Dict) -> Optional[str]:
+    """Returns an event start/end as a timestamp, or a date for all-day events"""
+    return when.get('dateTime') or when.get('date')
+
+
+# Google recommends keeping batches small; large ones are prone to HTTP 500s
+BATCH_LIMIT = 25
+
+
+def batch_execute(service, requests: List) -> List:
+    """
+    Executes API requests as multipart batches of up to BATCH_LIMIT calls each.
+    Returns one entry per request, in order: the response or the raised exception.
+    """
+    results = [None] * len(requests)
+    
+    def callback(request_id, response, exception):
+        results[int(request_id)] = exception if exception is not None else response
+    
+    for start in range(0, len(requests), BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=callback)
+        for index in range(start, min(start + BATCH_LIMIT, len(requests))):
+            batch.add(requests[index], request_id=str(index))
+        batch.execute()
+    
+    return results
+
+
+# Metadata fields requested for a single Drive file
+FILE_DETAIL_FIELDS = ("id, name, mimeType, size, createdTime, modifiedTime, "
+                      "webViewLink, webContentLink, description, owners(displayName), shared")
+
+# Content preview length, and the byte range fetched for it (UTF-8 uses at
+# most 4 bytes per character, so this always covers PREVIEW_CHARS + 1)
+PREVIEW_CHARS = 1000
+PREVIEW_BYTES = 4 * (PREVIEW_CHARS + 1)
+
+# Drive query clause for each file_type accepted by google_drive_search;
+# values ending in '/' match a whole family of MIME types
+MIME_TYPE_FILTERS = {
+    file_type: (f" and mimeType contains '{mime}'" if mime.endswith('/')
+                else f" and mimeType='{mime}'")
+    for file_type, mime in {
+        'document': 'application/vnd.google-apps.document',
+        'spreadsheet': 'application/vnd.google-apps.spreadsheet',
+        'presentation': 'application/vnd.google-apps.presentation',
+        'pdf': 'application/pdf',
+        'folder': 'application/vnd.google-apps.folder',
+        'image': 'image/',
+        'video': 'video/',
+    }.items()
+}
+
+# Event fields read by google_calendar_view; everything else is left out of the response
+EVENT_LIST_FIELDS = ("items(id, summary, start, end, location, description, "
+                     "attendees(email, responseStatus), organizer(email), htmlLink, status)")
+
+
+def format_file_details(file: Dict) -> Dict:
+    """Shapes a Drive file resource into the dict returned by the file tools"""
+    return {
+        'id': file['id'],
+        'name': file['name'],
+        'type': file['mimeType'],
+        'size': f"{int(file.get('size', 0)) / 1024:.2f} KB" if file.get('size') else 'N/A',
+        'created': file.get('createdTime'),
+        'modified': file.get('modifiedTime'),
+        'view_link': file.get('webViewLink'),
+        'download_link': file.get('webContentLink'),
+        'description': file.get('description', 'No description'),
+        'shared': file.get('shared', False),
+        'owner': file.get('owners', [{}])[0].get('displayName', 'Unknown')
+    }
+
+
 # ==================== GOOGLE DRIVE TOOLS ====================
 
 @mcp.tool()
+@run_in_thread
 def google_drive_search(
     query: str,
     file_type: Optional[str] = None,
@@ -85,35 +268,13 @@ def google_drive_search(
         google_drive_search("*.pdf", file_type="pdf")
     """
     try:
-        creds = get_credentials()
-        if not creds:
+        service = get_service('drive', 'v3')
+        if not service:
             return "Error: Google credentials not found. Please set up credentials.json file."
         
-        service = build('drive', 'v3', credentials=creds)
-        
-        # Build search query
-        search_query = f"name contains '{query}'"
-        
-        # Add MIME type filter if specified
-        mime_types = {
-            'document': 'application/vnd.google-apps.document',
-            'spreadsheet': 'application/vnd.google-apps.spreadsheet',
-            'presentation': 'application/vnd.google-apps.presentation',
-            'pdf': 'application/pdf',
-            'folder': 'application/vnd.google-apps.folder',
-            'image': 'image/',
-            'video': 'video/',
-        }
-        
-        if file_type and file_type.lower() in mime_types:
-            mime = mime_types[file_type.lower()]
-            if mime.endswith('/'):
-                search_query += f" and mimeType contains '{mime}'"
-            else:
-                search_query += f" and mimeType='{mime}'"
-        
-        # Add trashed filter
-        search_query += " and trashed=false"
+        # Build search query, with a MIME type filter if specified
+        mime_filter = MIME_TYPE_FILTERS.get(file_type.lower(), "") if file_type else ""
+        search_query = f"name contains '{query}'{mime_filter} and trashed=false"
         
         # Execute search
         results = service.files().list(
@@ -153,6 +314,7 @@ def google_drive_search(
 
 
 @mcp.tool()
+@run_in_thread
 def google_drive_get_file(
     file_id: str,
     include_content: bool = False
@@ -168,46 +330,29 @@ def google_drive_get_file(
         File details and optionally content, or error message
     """
     try:
-        creds = get_credentials()
-        if not creds:
+        service = get_service('drive', 'v3')
+        if not service:
             return "Error: Google credentials not found."
         
-        service = build('drive', 'v3', credentials=creds)
-        
         # Get file metadata
         file = service.files().get(
             fileId=file_id,
-            fields="id, name, mimeType, size, createdTime, modifiedTime, "
-                   "webViewLink, webContentLink, description, owners, shared, "
-                   "permissions, parents"
+            fields=FILE_DETAIL_FIELDS
         ).execute()
         
-        file_info = {
-            'id': file['id'],
-            'name': file['name'],
-            'type': file['mimeType'],
-            'size': f"{int(file.get('size', 0)) / 1024:.2f} KB" if file.get('size') else 'N/A',
-            'created': file.get('createdTime'),
-            'modified': file.get('modifiedTime'),
-            'view_link': file.get('webViewLink'),
-            'download_link': file.get('webContentLink'),
-            'description': file.get('description', 'No description'),
-            'shared': file.get('shared', False),
-            'owner': file.get('owners', [{}])[0].get('displayName', 'Unknown')
-        }
+        file_info = format_file_details(file)
         
         # Download content if requested (for text-based files)
         if include_content:
             try:
+                # Only download enough bytes for the preview, not the whole file
                 request = service.files().get_media(fileId=file_id)
-                fh = io.BytesIO()
-                downloader = MediaIoBaseDownload(fh, request)
-                done = False
-                while not done:
-                    status, done = downloader.next_chunk()
+                request.headers['Range'] = f"bytes=0-{PREVIEW_BYTES - 1}"
+                data = request.execute()
                 
-                content = fh.getvalue().decode('utf-8')
-                file_info['content_preview'] = content[:1000] + "..." if len(content) > 1000 else content
+                # Tolerate a multi-byte character cut off at the range boundary
+                content = codecs.getincrementaldecoder('utf-8')().decode(data, final=False)
+                file_info['content_preview'] = content[:PREVIEW_CHARS] + "..." if len(content) > PREVIEW_CHARS else content
             except:
                 file_info['content_preview'] = "Content preview not available for this file type"
         
@@ -217,9 +362,49 @@ def google_drive_get_file(
         return f"Error retrieving file: {str(e)}"
 
 
+@mcp.tool()
+@run_in_thread
+def google_drive_get_files(file_ids: List[str]) -> Union[List[Dict], str]:
+    """
+    Retrieves details for several Google Drive files in batched requests.
+    
+    Fetches metadata for up to 25 files per HTTP round-trip instead of
+    calling google_drive_get_file once per file.
+    
+    Args:
+        file_ids: List of unique file IDs
+        
+    Returns:
+        List of file details in the same order as file_ids (entries for files
+        that could not be fetched contain 'id' and 'error'), or error message
+    """
+    try:
+        service = get_service('drive', 'v3')
+        if not service:
+            return "Error: Google credentials not found."
+        
+        requests = [
+            service.files().get(fileId=file_id, fields=FILE_DETAIL_FIELDS)
+            for file_id in file_ids
+        ]
+        
+        file_list = []
+        for file_id, result in zip(file_ids, batch_execute(service, requests)):
+            if isinstance(result, Exception):
+                file_list.append({'id': file_id, 'error': str(result)})
+            else:
+                file_list.append(format_file_details(result))
+        
+        return file_list
+        
+    except Exception as e:
+        return f"Error retrieving files: {str(e)}"
+
+
 # ==================== GOOGLE CALENDAR TOOLS ====================
 
 @mcp.tool()
+@run_in_thread
 def google_calendar_view(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
@@ -250,24 +435,23 @@ def google_calendar_view(
         google_calendar_view(max_results=5)  # Next 5 events
     """
     try:
-        creds = get_credentials()
-        if not creds:
+        service = get_service('calendar', 'v3')
+        if not service:
             return "Error: Google credentials not found."
         
-        service = build('calendar', 'v3', credentials=creds)
-        
         # Set date range
+        now = datetime.now(timezone.utc)
         if start_date:
-            time_min = datetime.fromisoformat(start_date).isoformat() + 'Z'
+            time_min = to_rfc3339(datetime.fromisoformat(start_date))
         else:
-            time_min = datetime.utcnow().isoformat() + 'Z'
+            time_min = to_rfc3339(now)
         
         if end_date:
-            time_max = datetime.fromisoformat(end_date).replace(
+            time_max = to_rfc3339(datetime.fromisoformat(end_date).replace(
                 hour=23, minute=59, second=59
-            ).isoformat() + 'Z'
+            ))
         else:
-            time_max = (datetime.utcnow() + timedelta(days=7)).isoformat() + 'Z'
+            time_max = to_rfc3339(now + timedelta(days=7))
         
         # Query events
         events_result = service.events().list(
@@ -276,7 +460,8 @@ def google_calendar_view(
             timeMax=time_max,
             maxResults=max_results,
             singleEvents=True,
-            orderBy='startTime'
+            orderBy='startTime',
+            fields=EVENT_LIST_FIELDS
         ).execute()
         
         events = events_result.get('items', [])
@@ -285,16 +470,12 @@ def google_calendar_view(
             return "No upcoming events found in the specified date range."
         
         # Format events
-        event_list = []
-        for event in events:
-            start = event['start'].get('dateTime', event['start'].get('date'))
-            end = event['end'].get('dateTime', event['end'].get('date'))
-            
-            event_info = {
+        return [
+            {
                 'id': event['id'],
                 'summary': event.get('summary', 'No title'),
-                'start': start,
-                'end': end,
+                'start': event_time(event['start']),
+                'end': event_time(event['end']),
                 'location': event.get('location', 'No location'),
                 'description': event.get('description', 'No description'),
                 'attendees': [
@@ -302,21 +483,21 @@ def google_calendar_view(
                         'email': attendee.get('email'),
                         'status': attendee.get('responseStatus', 'unknown')
                     }
-                    for attendee in event.get('attendees', [])
+                    for attendee in event.get('attendees', ())
                 ],
                 'organizer': event.get('organizer', {}).get('email', 'Unknown'),
                 'link': event.get('htmlLink'),
                 'status': event.get('status', 'confirmed')
             }
-            event_list.append(event_info)
-        
-        return event_list
+            for event in events
+        ]
         
     except Exception as e:
         return f"Error viewing calendar: {str(e)}"
 
 
 @mcp.tool()
+@run_in_thread
 def google_calendar_create(
     summary: str,
     start_time: str,
@@ -325,7 +506,8 @@ def google_calendar_create(
     location: Optional[str] = None,
     attendees: Optional[List[str]] = None,
     reminders: Optional[int] = 10,
-    calendar_id: str = 'primary'
+    calendar_id: str = 'primary',
+    check_conflicts: Optional[bool] = None
 ) -> Union[Dict, str]:
     """
     Creates new calendar events and meetings in Google Calendar.
@@ -345,6 +527,8 @@ def google_calendar_create(
         attendees: List of attendee email addresses (optional)
         reminders: Minutes before event to send reminder (default: 10)
         calendar_id: Calendar ID to create event in (default: 'primary')
+        check_conflicts: Look for overlapping events first (default: only when
+            attendees are invited)
         
     Returns:
         Created event details with confirmation, or error message
@@ -359,12 +543,10 @@ def google_calendar_create(
         )
     """
     try:
-        creds = get_credentials()
-        if not creds:
+        service = get_service('calendar', 'v3')
+        if not service:
             return "Error: Google credentials not found."
         
-        service = build('calendar', 'v3', credentials=creds)
-        
         # Validate time format
         try:
             start_dt = datetime.fromisoformat(start_time)
@@ -405,15 +587,22 @@ def google_calendar_create(
             event['attendees'] = [{'email': email} for email in attendees]
             event['sendUpdates'] = 'all'  # Send invitations
         
-        # Check for conflicts
-        conflicts = service.events().list(
-            calendarId=calendar_id,
-            timeMin=start_time + 'Z' if not start_time.endswith('Z') else start_time,
-            timeMax=end_time + 'Z' if not end_time.endswith('Z') else end_time,
-            singleEvents=True
-        ).execute()
-        
-        has_conflicts = len(conflicts.get('items', [])) > 0
+        # Check for conflicts; skipped by default for personal events to save a round-trip
+        if check_conflicts is None:
+            check_conflicts = bool(attendees)
+        
+        has_conflicts = None
+        if check_conflicts:
+            conflicts = service.events().list(
+                calendarId=calendar_id,
+                timeMin=to_rfc3339(start_dt),
+                timeMax=to_rfc3339(end_dt),
+                singleEvents=True,
+                maxResults=1,
+                fields='items(id)'
+            ).execute()
+            
+            has_conflicts = len(conflicts.get('items', [])) > 0
         
         # Create event
         created_event = service.events().insert(
@@ -440,6 +629,7 @@ def google_calendar_create(
 
 
 @mcp.tool()
+@run_in_thread
 def google_calendar_update(
     event_id: str,
     summary: Optional[str] = None,
@@ -465,12 +655,10 @@ def google_calendar_update(
         Updated event details or error message
     """
     try:
-        creds = get_credentials()
-        if not creds:
+        service = get_service('calendar', 'v3')
+        if not service:
             return "Error: Google credentials not found."
         
-        service = build('calendar', 'v3', credentials=creds)
-        
         # Get existing event
         event = service.events().get(calendarId=calendar_id, eventId=event_id).execute()
         
@@ -507,6 +695,7 @@ def google_calendar_update(
 
 
 @mcp.tool()
+@run_in_thread
 def google_calendar_delete(
     event_id: str,
     calendar_id: str = 'primary'
@@ -522,12 +711,10 @@ def google_calendar_delete(
         Confirmation message or error
     """
     try:
-        creds = get_credentials()
-        if not creds:
+        service = get_service('calendar', 'v3')
+        if not service:
             return "Error: Google credentials not found."
         
-        service = build('calendar', 'v3', credentials=creds)
-        
         service.events().delete(
             calendarId=calendar_id,
             eventId=event_id,
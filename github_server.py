@@ -1,103 +1,262 @@
 from mcp.server.fastmcp import FastMCP
-import requests
+import httpx
+import orjson
+from cachetools import LRUCache
 import os
-import base64
-from typing import Optional, List, Dict, Any
+import binascii
+import time
+import random
+from email.utils import parsedate_to_datetime
+import asyncio
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from typing import Final, Optional, List, Dict, Any, Union
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-mcp = FastMCP("github")
-
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+# Read once at import; the client sends it on every request
+GITHUB_TOKEN: Final[str] = os.getenv("GITHUB_TOKEN", "")
 if not GITHUB_TOKEN:
     raise ValueError("GITHUB_TOKEN environment variable is required")
 
 BASE_URL = "https://api.github.com"
-HEADERS = {
+HEADERS = MappingProxyType({
     "Authorization": f"token {GITHUB_TOKEN}",
     "Accept": "application/vnd.github.v3+json",
-    "User-Agent": "MCP-GitHub-Server"
-}
-
-def api_request(method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
+    "User-Agent": "MCP-GitHub-Server",
+    "Content-Type": "application/json"
+})
+
+# Shared async client; over HTTP/2 concurrent tool calls multiplex on one connection to api.github.com
+_client = httpx.AsyncClient(
+    base_url=BASE_URL,
+    headers=HEADERS,
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+    ),
+    timeout=30.0
+)
+
+# Transient gateway errors are retried with backoff, but only for requests
+# that are safe to repeat
+RETRY_STATUSES = {502, 503, 504}
+RETRY_METHODS = {"GET", "PUT", "DELETE"}
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3
+
+# Rate-limited requests were rejected without being applied, so any method may
+# be retried once the limit resets; waits longer than this are reported instead
+RATE_LIMIT_STATUSES = {403, 429}
+MAX_RATE_LIMIT_WAIT = 60
+
+# Raw GET response bodies keyed on endpoint and params, stored with their ETag.
+# Revalidating with If-None-Match gets a bodiless 304 when nothing changed,
+# and 304s do not count against the rate limit.
+_etag_cache = LRUCache(maxsize=512)
+
+
+@asynccontextmanager
+async def lifespan(server):
+    """Close the shared HTTP client when the server shuts down"""
+    try:
+        yield
+    finally:
+        await _client.aclose()
+
+
+mcp = FastMCP("github", lifespan=lifespan)
+
+def rate_limit_delay(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait before retrying a rate-limited response, or None if it was not rate limited"""
+    if response.status_code not in RATE_LIMIT_STATUSES:
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None:
+        # Secondary (abuse) limit: delay in seconds, or an HTTP date to wait until
+        try:
+            return max(float(retry_after), 0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0)
+        except (TypeError, ValueError):
+            return None
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        # Primary limit: wait for the window to reset, with jitter so queued calls spread out
+        reset = float(response.headers.get("X-RateLimit-Reset", 0))
+        return max(reset - time.time(), 0) + random.uniform(0, 1)
+    return None
+
+async def api_request(method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
     """Helper function for GitHub API requests"""
-    url = f"{BASE_URL}{endpoint}"
+    # Bodies are encoded and responses parsed with orjson rather than the stdlib json module
+    content = orjson.dumps(data) if data is not None else None
+    
+    cache_key = cached = None
+    headers = {}
+    if method == "GET":
+        cache_key = (endpoint, tuple(sorted(params.items())) if params else ())
+        cached = _etag_cache.get(cache_key)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+    
     try:
-        response = requests.request(method, url, headers=HEADERS, json=data, params=params)
+        response = await _client.request(method, endpoint, content=content, params=params, headers=headers)
+        for attempt in range(MAX_RETRIES):
+            if method in RETRY_METHODS and response.status_code in RETRY_STATUSES:
+                delay = BACKOFF_FACTOR * 2 ** attempt
+            else:
+                delay = rate_limit_delay(response)
+                if delay is None or delay > MAX_RATE_LIMIT_WAIT:
+                    break
+            await asyncio.sleep(delay)
+            response = await _client.request(method, endpoint, content=content, params=params, headers=headers)
+        
+        if response.status_code == 304 and cached:
+            return orjson.loads(cached[1])
         response.raise_for_status()
-        return response.json() if response.content else {"success": True}
-    except requests.exceptions.RequestException as e:
+        
+        etag = response.headers.get("ETag")
+        if cache_key and etag and response.content:
+            _etag_cache[cache_key] = (etag, response.content)
+        return orjson.loads(response.content) if response.content else {"success": True}
+    except (httpx.HTTPError, ValueError) as e:
         return {"error": str(e)}
 
+async def graphql(query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs a GraphQL query, fetching a chain of related objects in one round-trip"""
+    response = await api_request("POST", "/graphql", {"query": query, "variables": variables})
+    if "errors" in response:
+        return {"error": "; ".join(error.get("message", "") for error in response["errors"])}
+    return response.get("data", response)
+
+# Pages fetched concurrently per round by api_request_all_pages
+PAGE_PREFETCH = 4
+
+async def api_request_all_pages(endpoint: str, params: Optional[Dict] = None, max_pages: int = 10) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Fetches every page of a list endpoint (up to max_pages of 100 items).
+    Pages are requested PAGE_PREFETCH at a time, so a long listing costs a
+    few round-trips instead of one per page. Stops at the first short page.
+    If a page fails, returns the error with the items from the pages before it.
+    """
+    if max_pages < 1:
+        return {"error": "max_pages must be at least 1"}
+    
+    items = []
+    for first_page in range(1, max_pages + 1, PAGE_PREFETCH):
+        pages = range(first_page, min(first_page + PAGE_PREFETCH, max_pages + 1))
+        responses = await asyncio.gather(*(
+            api_request("GET", endpoint, params={**(params or {}), "page": page, "per_page": 100})
+            for page in pages
+        ))
+        for response in responses:
+            if "error" in response:
+                return {"error": response["error"], "items": items}
+            items.extend(response)
+            if len(response) < 100:
+                return items
+    return items
+
+PULL_REQUEST_STATUS_QUERY = """
+query($owner: String!, $name: String!, $number: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      commits(last: 1) {
+        nodes {
+          commit {
+            oid
+            status {
+              state
+              contexts { context state description targetUrl createdAt }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+CREATE_COMMIT_MUTATION = """
+mutation($input: CreateCommitOnBranchInput!) {
+  createCommitOnBranch(input: $input) {
+    commit { oid url }
+  }
+}
+"""
+
 @mcp.tool()
-def create_or_update_file(owner: str, repo: str, path: str, content: str, message: str, branch: str, sha: Optional[str] = None) -> Dict[str, Any]:
+async def create_or_update_file(owner: str, repo: str, path: str, content: str, message: str, branch: str, sha: Optional[str] = None) -> Dict[str, Any]:
     """Create or update a single file in a repository"""
-    encoded_content = base64.b64encode(content.encode()).decode()
+    encoded_content = binascii.b2a_base64(content.encode(), newline=False).decode("ascii")
     data = {"message": message, "content": encoded_content, "branch": branch}
     if sha:
         data["sha"] = sha
-    return api_request("PUT", f"/repos/{owner}/{repo}/contents/{path}", data)
+    return await api_request("PUT", f"/repos/{owner}/{repo}/contents/{path}", data)
 
 @mcp.tool()
-def push_files(owner: str, repo: str, branch: str, files: List[Dict[str, str]], message: str) -> Dict[str, Any]:
+async def push_files(owner: str, repo: str, branch: str, files: List[Dict[str, str]], message: str) -> Dict[str, Any]:
     """Push multiple files in a single commit"""
-    ref_response = api_request("GET", f"/repos/{owner}/{repo}/git/ref/heads/{branch}")
+    ref_response = await api_request("GET", f"/repos/{owner}/{repo}/git/ref/heads/{branch}")
     if "error" in ref_response:
         return ref_response
     
-    base_sha = ref_response["object"]["sha"]
-    commit_response = api_request("GET", f"/repos/{owner}/{repo}/git/commits/{base_sha}")
-    if "error" in commit_response:
-        return commit_response
-    
-    tree_sha = commit_response["tree"]["sha"]
-    tree_items = []
-    
-    for file in files:
-        blob_data = {"content": file["content"], "encoding": "utf-8"}
-        blob_response = api_request("POST", f"/repos/{owner}/{repo}/git/blobs", blob_data)
-        if "error" in blob_response:
-            return blob_response
-        tree_items.append({"path": file["path"], "mode": "100644", "type": "blob", "sha": blob_response["sha"]})
+    # createCommitOnBranch builds the tree server-side, replacing the blob, tree,
+    # commit and ref-update REST calls with a single mutation
+    headline, _, body = message.partition("\n")
+    commit_input = {
+        "branch": {"repositoryNameWithOwner": f"{owner}/{repo}", "branchName": branch},
+        "message": {"headline": headline, "body": body.strip()},
+        "fileChanges": {"additions": [
+            {"path": file["path"], "contents": binascii.b2a_base64(file["content"].encode(), newline=False).decode("ascii")}
+            for file in files
+        ]},
+        "expectedHeadOid": ref_response["object"]["sha"]
+    }
+    result = await graphql(CREATE_COMMIT_MUTATION, {"input": commit_input})
+    if "error" in result:
+        return result
     
-    new_tree = api_request("POST", f"/repos/{owner}/{repo}/git/trees", {"base_tree": tree_sha, "tree": tree_items})
-    if "error" in new_tree:
-        return new_tree
-    
-    new_commit = api_request("POST", f"/repos/{owner}/{repo}/git/commits", {"message": message, "tree": new_tree["sha"], "parents": [base_sha]})
-    if "error" in new_commit:
-        return new_commit
-    
-    return api_request("PATCH", f"/repos/{owner}/{repo}/git/refs/heads/{branch}", {"sha": new_commit["sha"]})
+    commit = result["createCommitOnBranch"]["commit"]
+    return {"ref": f"refs/heads/{branch}", "object": {"sha": commit["oid"], "type": "commit", "url": commit["url"]}}
 
 @mcp.tool()
-def search_repositories(query: str, page: Optional[int] = 1, perPage: Optional[int] = 30) -> Dict[str, Any]:
+async def search_repositories(query: str, page: Optional[int] = 1, perPage: Optional[int] = 30) -> Dict[str, Any]:
     """Search for GitHub repositories"""
     params = {"q": query, "page": page, "per_page": min(perPage, 100)}
-    return api_request("GET", "/search/repositories", params=params)
+    return await api_request("GET", "/search/repositories", params=params)
 
 @mcp.tool()
-def create_repository(name: str, description: Optional[str] = None, private: Optional[bool] = False, autoInit: Optional[bool] = False) -> Dict[str, Any]:
+async def create_repository(name: str, description: Optional[str] = None, private: Optional[bool] = False, autoInit: Optional[bool] = False) -> Dict[str, Any]:
     """Create a new GitHub repository"""
     data = {"name": name, "private": private, "auto_init": autoInit}
     if description:
         data["description"] = description
-    return api_request("POST", "/user/repos", data)
+    return await api_request("POST", "/user/repos", data)
 
 @mcp.tool()
-def get_file_contents(owner: str, repo: str, path: str, branch: Optional[str] = None) -> Dict[str, Any]:
+async def get_file_contents(owner: str, repo: str, path: str, branch: Optional[str] = None) -> Dict[str, Any]:
     """Get contents of a file or directory"""
     params = {"ref": branch} if branch else {}
-    response = api_request("GET", f"/repos/{owner}/{repo}/contents/{path}", params=params)
+    response = await api_request("GET", f"/repos/{owner}/{repo}/contents/{path}", params=params)
     if "content" in response and "encoding" in response:
         if response["encoding"] == "base64":
-            response["decoded_content"] = base64.b64decode(response["content"]).decode('utf-8')
+            # a2b_base64 skips the line breaks GitHub inserts, with no separate strip/copy pass
+            raw = binascii.a2b_base64(response["content"])
+            try:
+                response["decoded_content"] = raw.decode('utf-8')
+            except UnicodeDecodeError:
+                # Binary file: leave it base64-encoded in "content"
+                response["decoded_bytes_len"] = len(raw)
     return response
 
 @mcp.tool()
-def create_issue(owner: str, repo: str, title: str, body: Optional[str] = None, assignees: Optional[List[str]] = None, labels: Optional[List[str]] = None, milestone: Optional[int] = None) -> Dict[str, Any]:
+async def create_issue(owner: str, repo: str, title: str, body: Optional[str] = None, assignees: Optional[List[str]] = None, labels: Optional[List[str]] = None, milestone: Optional[int] = None) -> Dict[str, Any]:
     """Create a new issue"""
     data = {"title": title}
     if body:
@@ -108,51 +267,62 @@ def create_issue(owner: str, repo: str, title: str, body: Optional[str] = None,
         data["labels"] = labels
     if milestone:
         data["milestone"] = milestone
-    return api_request("POST", f"/repos/{owner}/{repo}/issues", data)
+    return await api_request("POST", f"/repos/{owner}/{repo}/issues", data)
 
 @mcp.tool()
-def create_pull_request(owner: str, repo: str, title: str, head: str, base: str, body: Optional[str] = None, draft: Optional[bool] = False, maintainer_can_modify: Optional[bool] = True) -> Dict[str, Any]:
+async def create_pull_request(owner: str, repo: str, title: str, head: str, base: str, body: Optional[str] = None, draft: Optional[bool] = False, maintainer_can_modify: Optional[bool] = True) -> Dict[str, Any]:
     """Create a new pull request"""
     data = {"title": title, "head": head, "base": base, "draft": draft, "maintainer_can_modify": maintainer_can_modify}
     if body:
         data["body"] = body
-    return api_request("POST", f"/repos/{owner}/{repo}/pulls", data)
+    return await api_request("POST", f"/repos/{owner}/{repo}/pulls", data)
 
 @mcp.tool()
-def fork_repository(owner: str, repo: str, organization: Optional[str] = None) -> Dict[str, Any]:
+async def fork_repository(owner: str, repo: str, organization: Optional[str] = None) -> Dict[str, Any]:
     """Fork a repository"""
     data = {"organization": organization} if organization else {}
-    return api_request("POST", f"/repos/{owner}/{repo}/forks", data)
+    return await api_request("POST", f"/repos/{owner}/{repo}/forks", data)
 
 @mcp.tool()
-def create_branch(owner: str, repo: str, branch: str, from_branch: Optional[str] = None) -> Dict[str, Any]:
+async def create_branch(owner: str, repo: str, branch: str, from_branch: Optional[str] = None) -> Dict[str, Any]:
     """Create a new branch"""
+    repo_path = f"/repos/{owner}/{repo}"
     if from_branch:
-        ref_response = api_request("GET", f"/repos/{owner}/{repo}/git/ref/heads/{from_branch}")
+        ref_response = await api_request("GET", repo_path + "/git/ref/heads/" + from_branch)
     else:
-        repo_response = api_request("GET", f"/repos/{owner}/{repo}")
+        repo_response = await api_request("GET", repo_path)
         if "error" in repo_response:
             return repo_response
-        ref_response = api_request("GET", f"/repos/{owner}/{repo}/git/ref/heads/{repo_response['default_branch']}")
+        ref_response = await api_request("GET", repo_path + "/git/ref/heads/" + repo_response["default_branch"])
     
     if "error" in ref_response:
         return ref_response
     
     sha = ref_response["object"]["sha"]
-    return api_request("POST", f"/repos/{owner}/{repo}/git/refs", {"ref": f"refs/heads/{branch}", "sha": sha})
+    return await api_request("POST", repo_path + "/git/refs", {"ref": "refs/heads/" + branch, "sha": sha})
 
 @mcp.tool()
-def list_issues(owner: str, repo: str, state: Optional[str] = "open", labels: Optional[List[str]] = None, sort: Optional[str] = "created", direction: Optional[str] = "desc", since: Optional[str] = None, page: Optional[int] = 1, per_page: Optional[int] = 30) -> List[Dict[str, Any]]:
+async def list_issues(owner: str, repo: str, state: Optional[str] = "open", labels: Optional[List[str]] = None, sort: Optional[str] = "created", direction: Optional[str] = "desc", since: Optional[str] = None, page: Optional[int] = 1, per_page: Optional[int] = 30) -> List[Dict[str, Any]]:
     """List and filter repository issues"""
     params = {"state": state, "sort": sort, "direction": direction, "page": page, "per_page": min(per_page, 100)}
     if labels:
         params["labels"] = ",".join(labels)
     if since:
         params["since"] = since
-    return api_request("GET", f"/repos/{owner}/{repo}/issues", params=params)
+    return await api_request("GET", f"/repos/{owner}/{repo}/issues", params=params)
+
+@mcp.tool()
+async def list_issues_all(owner: str, repo: str, state: Optional[str] = "open", labels: Optional[List[str]] = None, sort: Optional[str] = "created", direction: Optional[str] = "desc", since: Optional[str] = None, max_pages: int = 10) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """List all matching repository issues across pages (up to max_pages of 100 each)"""
+    params = {"state": state, "sort": sort, "direction": direction}
+    if labels:
+        params["labels"] = ",".join(labels)
+    if since:
+        params["since"] = since
+    return await api_request_all_pages(f"/repos/{owner}/{repo}/issues", params, max_pages)
 
 @mcp.tool()
-def update_issue(owner: str, repo: str, issue_number: int, title: Optional[str] = None, body: Optional[str] = None, state: Optional[str] = None, labels: Optional[List[str]] = None, assignees: Optional[List[str]] = None, milestone: Optional[int] = None) -> Dict[str, Any]:
+async def update_issue(owner: str, repo: str, issue_number: int, title: Optional[str] = None, body: Optional[str] = None, state: Optional[str] = None, labels: Optional[List[str]] = None, assignees: Optional[List[str]] = None, milestone: Optional[int] = None) -> Dict[str, Any]:
     """Update an existing issue"""
     data = {}
     if title:
@@ -167,115 +337,143 @@ def update_issue(owner: str, repo: str, issue_number: int, title: Optional[str]
         data["assignees"] = assignees
     if milestone:
         data["milestone"] = milestone
-    return api_request("PATCH", f"/repos/{owner}/{repo}/issues/{issue_number}", data)
+    return await api_request("PATCH", f"/repos/{owner}/{repo}/issues/{issue_number}", data)
 
 @mcp.tool()
-def add_issue_comment(owner: str, repo: str, issue_number: int, body: str) -> Dict[str, Any]:
+async def add_issue_comment(owner: str, repo: str, issue_number: int, body: str) -> Dict[str, Any]:
     """Add a comment to an issue"""
-    return api_request("POST", f"/repos/{owner}/{repo}/issues/{issue_number}/comments", {"body": body})
+    return await api_request("POST", f"/repos/{owner}/{repo}/issues/{issue_number}/comments", {"body": body})
 
 @mcp.tool()
-def search_code(q: str, sort: Optional[str] = None, order: Optional[str] = "desc", per_page: Optional[int] = 30, page: Optional[int] = 1) -> Dict[str, Any]:
+async def search_code(q: str, sort: Optional[str] = None, order: Optional[str] = "desc", per_page: Optional[int] = 30, page: Optional[int] = 1) -> Dict[str, Any]:
     """Search for code across GitHub repositories"""
     params = {"q": q, "per_page": min(per_page, 100), "page": page, "order": order}
     if sort:
         params["sort"] = sort
-    return api_request("GET", "/search/code", params=params)
+    return await api_request("GET", "/search/code", params=params)
 
 @mcp.tool()
-def search_issues(q: str, sort: Optional[str] = None, order: Optional[str] = "desc", per_page: Optional[int] = 30, page: Optional[int] = 1) -> Dict[str, Any]:
+async def search_issues(q: str, sort: Optional[str] = None, order: Optional[str] = "desc", per_page: Optional[int] = 30, page: Optional[int] = 1) -> Dict[str, Any]:
     """Search for issues and pull requests"""
     params = {"q": q, "per_page": min(per_page, 100), "page": page, "order": order}
     if sort:
         params["sort"] = sort
-    return api_request("GET", "/search/issues", params=params)
+    return await api_request("GET", "/search/issues", params=params)
 
 @mcp.tool()
-def search_users(q: str, sort: Optional[str] = None, order: Optional[str] = "desc", per_page: Optional[int] = 30, page: Optional[int] = 1) -> Dict[str, Any]:
+async def search_users(q: str, sort: Optional[str] = None, order: Optional[str] = "desc", per_page: Optional[int] = 30, page: Optional[int] = 1) -> Dict[str, Any]:
     """Search for GitHub users"""
     params = {"q": q, "per_page": min(per_page, 100), "page": page, "order": order}
     if sort:
         params["sort"] = sort
-    return api_request("GET", "/search/users", params=params)
+    return await api_request("GET", "/search/users", params=params)
 
 @mcp.tool()
-def list_commits(owner: str, repo: str, page: Optional[int] = 1, per_page: Optional[int] = 30, sha: Optional[str] = None) -> List[Dict[str, Any]]:
+async def list_commits(owner: str, repo: str, page: Optional[int] = 1, per_page: Optional[int] = 30, sha: Optional[str] = None) -> List[Dict[str, Any]]:
     """Gets commits of a branch in a repository"""
     params = {"page": page, "per_page": min(per_page, 100)}
     if sha:
         params["sha"] = sha
-    return api_request("GET", f"/repos/{owner}/{repo}/commits", params=params)
+    return await api_request("GET", f"/repos/{owner}/{repo}/commits", params=params)
 
 @mcp.tool()
-def get_issue(owner: str, repo: str, issue_number: int) -> Dict[str, Any]:
+async def get_issue(owner: str, repo: str, issue_number: int) -> Dict[str, Any]:
     """Gets the contents of an issue within a repository"""
-    return api_request("GET", f"/repos/{owner}/{repo}/issues/{issue_number}")
+    return await api_request("GET", f"/repos/{owner}/{repo}/issues/{issue_number}")
 
 @mcp.tool()
-def get_pull_request(owner: str, repo: str, pull_number: int) -> Dict[str, Any]:
+async def get_pull_request(owner: str, repo: str, pull_number: int) -> Dict[str, Any]:
     """Get details of a specific pull request"""
-    return api_request("GET", f"/repos/{owner}/{repo}/pulls/{pull_number}")
+    return await api_request("GET", f"/repos/{owner}/{repo}/pulls/{pull_number}")
 
 @mcp.tool()
-def list_pull_requests(owner: str, repo: str, state: Optional[str] = "open", head: Optional[str] = None, base: Optional[str] = None, sort: Optional[str] = "created", direction: Optional[str] = "desc", per_page: Optional[int] = 30, page: Optional[int] = 1) -> List[Dict[str, Any]]:
+async def list_pull_requests(owner: str, repo: str, state: Optional[str] = "open", head: Optional[str] = None, base: Optional[str] = None, sort: Optional[str] = "created", direction: Optional[str] = "desc", per_page: Optional[int] = 30, page: Optional[int] = 1) -> List[Dict[str, Any]]:
     """List and filter repository pull requests"""
     params = {"state": state, "sort": sort, "direction": direction, "per_page": min(per_page, 100), "page": page}
     if head:
         params["head"] = head
     if base:
         params["base"] = base
-    return api_request("GET", f"/repos/{owner}/{repo}/pulls", params=params)
+    return await api_request("GET", f"/repos/{owner}/{repo}/pulls", params=params)
 
 @mcp.tool()
-def create_pull_request_review(owner: str, repo: str, pull_number: int, body: str, event: str, commit_id: Optional[str] = None, comments: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+async def create_pull_request_review(owner: str, repo: str, pull_number: int, body: str, event: str, commit_id: Optional[str] = None, comments: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
     """Create a review on a pull request"""
     data = {"body": body, "event": event}
     if commit_id:
         data["commit_id"] = commit_id
     if comments:
         data["comments"] = comments
-    return api_request("POST", f"/repos/{owner}/{repo}/pulls/{pull_number}/reviews", data)
+    return await api_request("POST", f"/repos/{owner}/{repo}/pulls/{pull_number}/reviews", data)
 
 @mcp.tool()
-def merge_pull_request(owner: str, repo: str, pull_number: int, commit_title: Optional[str] = None, commit_message: Optional[str] = None, merge_method: Optional[str] = "merge") -> Dict[str, Any]:
+async def merge_pull_request(owner: str, repo: str, pull_number: int, commit_title: Optional[str] = None, commit_message: Optional[str] = None, merge_method: Optional[str] = "merge") -> Dict[str, Any]:
     """Merge a pull request"""
     data = {"merge_method": merge_method}
     if commit_title:
         data["commit_title"] = commit_title
     if commit_message:
         data["commit_message"] = commit_message
-    return api_request("PUT", f"/repos/{owner}/{repo}/pulls/{pull_number}/merge", data)
+    return await api_request("PUT", f"/repos/{owner}/{repo}/pulls/{pull_number}/merge", data)
 
 @mcp.tool()
-def get_pull_request_files(owner: str, repo: str, pull_number: int) -> List[Dict[str, Any]]:
+async def get_pull_request_files(owner: str, repo: str, pull_number: int) -> List[Dict[str, Any]]:
     """Get the list of files changed in a pull request"""
-    return api_request("GET", f"/repos/{owner}/{repo}/pulls/{pull_number}/files")
+    return await api_request("GET", f"/repos/{owner}/{repo}/pulls/{pull_number}/files")
 
 @mcp.tool()
-def get_pull_request_status(owner: str, repo: str, pull_number: int) -> Dict[str, Any]:
+async def get_pull_request_status(owner: str, repo: str, pull_number: int, head_sha: Optional[str] = None) -> Dict[str, Any]:
     """Get the combined status of all status checks for a pull request"""
-    pr_response = api_request("GET", f"/repos/{owner}/{repo}/pulls/{pull_number}")
-    if "error" in pr_response:
-        return pr_response
-    return api_request("GET", f"/repos/{owner}/{repo}/commits/{pr_response['head']['sha']}/status")
+    if head_sha:
+        # Head SHA already known (e.g. from list_pull_requests): one ETag-cacheable GET
+        return await api_request("GET", f"/repos/{owner}/{repo}/commits/{head_sha}/status")
+    
+    result = await graphql(PULL_REQUEST_STATUS_QUERY, {"owner": owner, "name": repo, "number": pull_number})
+    if "error" in result:
+        return result
+    
+    pull_request = (result.get("repository") or {}).get("pullRequest")
+    if not pull_request or not pull_request["commits"]["nodes"]:
+        return {"error": f"Pull request #{pull_number} not found in {owner}/{repo}"}
+    
+    # Shaped like the REST combined-status response
+    commit = pull_request["commits"]["nodes"][0]["commit"]
+    status = commit["status"] or {"state": "PENDING", "contexts": []}
+    statuses = [
+        {
+            "context": context["context"],
+            "state": context["state"].lower(),
+            "description": context["description"],
+            "target_url": context["targetUrl"],
+            "created_at": context["createdAt"]
+        }
+        for context in status["contexts"]
+    ]
+    return {"state": status["state"].lower(), "sha": commit["oid"], "total_count": len(statuses), "statuses": statuses}
 
 @mcp.tool()
-def update_pull_request_branch(owner: str, repo: str, pull_number: int, expected_head_sha: Optional[str] = None) -> Dict[str, Any]:
+async def update_pull_request_branch(owner: str, repo: str, pull_number: int, expected_head_sha: Optional[str] = None) -> Dict[str, Any]:
     """Update a pull request branch with the latest changes from the base branch"""
     data = {}
     if expected_head_sha:
         data["expected_head_sha"] = expected_head_sha
-    return api_request("PUT", f"/repos/{owner}/{repo}/pulls/{pull_number}/update-branch", data)
+    return await api_request("PUT", f"/repos/{owner}/{repo}/pulls/{pull_number}/update-branch", data)
 
 @mcp.tool()
-def get_pull_request_comments(owner: str, repo: str, pull_number: int) -> List[Dict[str, Any]]:
+async def get_pull_request_comments(owner: str, repo: str, pull_number: int) -> List[Dict[str, Any]]:
     """Get the review comments on a pull request"""
-    return api_request("GET", f"/repos/{owner}/{repo}/pulls/{pull_number}/comments")
+    return await api_request("GET", f"/repos/{owner}/{repo}/pulls/{pull_number}/comments")
 
 @mcp.tool()
-def get_pull_request_reviews(owner: str, repo: str, pull_number: int) -> List[Dict[str, Any]]:
+async def get_pull_request_reviews(owner: str, repo: str, pull_number: int) -> List[Dict[str, Any]]:
     """Get the reviews on a pull request"""
-    return api_request("GET", f"/repos/{owner}/{repo}/pulls/{pull_number}/reviews")
+    return await api_request("GET", f"/repos/{owner}/{repo}/pulls/{pull_number}/reviews")
 
 if __name__ == "__main__":
+    # uvloop is optional (not available on Windows); fall back to the default loop
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
     mcp.run(transport="stdio")
\ No newline at end of file
@@ -1,14 +1,12 @@
 import os
-import base64
-from email.mime.text import MIMEText
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain.agents import tool
 from langgraph.prebuilt import create_react_agent
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from gmail_common import build_raw_message, fetch_messages
 
 # Load environment variables
 load_dotenv()
@@ -33,7 +31,9 @@ def get_gmail_service():
         with open('token.json', 'w') as token:
             token.write(creds.to_json())
     
-    return build('gmail', 'v1', credentials=creds)
+    # Use the discovery document bundled with googleapiclient; no fetch at startup
+    return build('gmail', 'v1', credentials=creds,
+                 cache_discovery=False, static_discovery=True)
 
 # Initialize Gmail service
 print("🔐 Initializing Gmail service...")
@@ -55,11 +55,7 @@ def create_gmail_draft(to: str, subject: str, message: str) -> str:
         Success message with draft ID
     """
     try:
-        email_message = MIMEText(message)
-        email_message['to'] = to
-        email_message['subject'] = subject
-        
-        raw_message = base64.urlsafe_b64encode(email_message.as_bytes()).decode('utf-8')
+        raw_message = build_raw_message(to, subject, message)
         draft = gmail_service.users().drafts().create(
             userId='me',
             body={'message': {'raw': raw_message}}
@@ -83,11 +79,7 @@ def send_gmail_message(to: str, subject: str, message: str) -> str:
         Success message with message ID
     """
     try:
-        email_message = MIMEText(message)
-        email_message['to'] = to
-        email_message['subject'] = subject
-        
-        raw_message = base64.urlsafe_b64encode(email_message.as_bytes()).decode('utf-8')
+        raw_message = build_raw_message(to, subject, message)
         sent_message = gmail_service.users().messages().send(
             userId='me',
             body={'raw': raw_message}
@@ -122,17 +114,15 @@ def search_gmail(query: str, max_results: int = 5) -> str:
             return "No messages found matching your query."
         
         email_list = []
-        for msg in messages:
-            message = gmail_service.users().messages().get(
-                userId='me',
-                id=msg['id'],
-                format='metadata',
-                metadataHeaders=['Subject', 'From']
-            ).execute()
-            
-            headers = message['payload']['headers']
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-            from_email = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
+        for message in fetch_messages(
+            gmail_service,
+            [msg['id'] for msg in messages],
+            format='metadata',
+            metadataHeaders=['Subject', 'From']
+        ):
+            headers = {h['name']: h['value'] for h in message['payload']['headers']}
+            subject = headers.get('Subject', 'No Subject')
+            from_email = headers.get('From', 'Unknown')
             snippet = message.get('snippet', '')
             
             email_list.append(f"From: {from_email}\nSubject: {subject}\nSnippet: {snippet}\n")
@@ -165,17 +155,16 @@ def get_latest_gmail_messages(count: int = 5) -> str:
             return "No messages found in inbox."
         
         email_list = []
-        for msg in messages:
-            message = gmail_service.users().messages().get(
-                userId='me',
-                id=msg['id'],
-                format='full'
-            ).execute()
-            
-            headers = message['payload']['headers']
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-            from_email = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
-            date = next((h['value'] for h in headers if h['name'] == 'Date'), 'Unknown')
+        for message in fetch_messages(
+            gmail_service,
+            [msg['id'] for msg in messages],
+            format='metadata',
+            metadataHeaders=['Subject', 'From', 'Date']
+        ):
+            headers = {h['name']: h['value'] for h in message['payload']['headers']}
+            subject = headers.get('Subject', 'No Subject')
+            from_email = headers.get('From', 'Unknown')
+            date = headers.get('Date', 'Unknown')
             snippet = message.get('snippet', '')
             
             email_list.append(f"Date: {date}\nFrom: {from_email}\nSubject: {subject}\nSnippet: {snippet}\n")
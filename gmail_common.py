@@ -0,0 +1,90 @@
+"""Gmail helpers shared by gmail_server.py, gmail_agent_final.py and generate_token.py"""
+import io
+import time
+import base64
+from email.generator import BytesGenerator
+from email.mime.text import MIMEText
+from googleapiclient.errors import HttpError
+
+def encode_message(email_message: MIMEText) -> str:
+    """Serialize a MIME message into the base64url 'raw' string the Gmail API expects"""
+    # Flatten into one buffer and encode straight from it, avoiding the extra
+    # bytes copy that as_bytes() makes
+    buffer = io.BytesIO()
+    BytesGenerator(buffer, mangle_from_=False, policy=email_message.policy).flatten(email_message)
+    return base64.urlsafe_b64encode(buffer.getbuffer()).decode('ascii')
+
+# Headers for an all-ASCII plain-text email, byte-for-byte what MIMEText writes
+# for a body with plain \n line endings
+PLAIN_MESSAGE_TEMPLATE = (
+    'Content-Type: text/plain; charset="us-ascii"\n'
+    'MIME-Version: 1.0\n'
+    'Content-Transfer-Encoding: 7bit\n'
+    'to: {to}\n'
+    'subject: {subject}\n'
+    '\n'
+)
+
+def build_raw_message(to: str, subject: str, message: str) -> str:
+    """Build the base64url 'raw' string for a plain-text email"""
+    headers = to + subject
+    if (headers.isascii() and headers.isprintable() and message.isascii()
+            and max(len(to), len(subject)) < 70 and '\r' not in message):
+        # Common case: no encoding or header folding needed, so skip the email package
+        raw = (PLAIN_MESSAGE_TEMPLATE.format(to=to, subject=subject) + message).encode('ascii')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+    
+    email_message = MIMEText(message)
+    email_message['to'] = to
+    email_message['subject'] = subject
+    return encode_message(email_message)
+
+# Gmail accepts up to 100 calls per batch but throttles large ones; stay well below
+GMAIL_BATCH_LIMIT = 50
+
+# Calls rejected for rate limiting are retried with exponential backoff
+GMAIL_RETRY_STATUSES = {429, 500, 503}
+GMAIL_MAX_RETRIES = 4
+
+def fetch_messages_with_errors(gmail_service, message_ids, **get_kwargs):
+    """
+    Fetch several messages with batched requests instead of one round-trip each.
+    Returns the messages (None where a fetch failed) and the errors by index.
+    """
+    messages = [None] * len(message_ids)
+    errors = {}
+    pending = list(range(len(message_ids)))
+    
+    def callback(request_id, response, exception):
+        index = int(request_id)
+        if exception is not None:
+            errors[index] = exception
+        else:
+            messages[index] = response
+            errors.pop(index, None)
+    
+    for attempt in range(GMAIL_MAX_RETRIES + 1):
+        for start in range(0, len(pending), GMAIL_BATCH_LIMIT):
+            batch = gmail_service.new_batch_http_request(callback=callback)
+            for index in pending[start:start + GMAIL_BATCH_LIMIT]:
+                batch.add(
+                    gmail_service.users().messages().get(userId='me', id=message_ids[index], **get_kwargs),
+                    request_id=str(index)
+                )
+            batch.execute()
+        
+        pending = [index for index, error in errors.items()
+                   if isinstance(error, HttpError) and error.resp.status in GMAIL_RETRY_STATUSES]
+        if not pending or attempt == GMAIL_MAX_RETRIES:
+            break
+        time.sleep(2 ** attempt)
+    
+    return messages, errors
+
+def fetch_messages(gmail_service, message_ids, **get_kwargs):
+    """Fetch several messages with batched requests, raising the first error if any fetch failed"""
+    messages, errors = fetch_messages_with_errors(gmail_service, message_ids, **get_kwargs)
+    if errors:
+        raise next(iter(errors.values()))
+    return messages
+
@@ -4,36 +4,75 @@ Install: pip install mcp langchain-community google-auth google-auth-oauthlib go
 """
 
 from mcp.server.fastmcp import FastMCP
-from langchain_community.agent_toolkits import GmailToolkit
+from langchain_community.tools.gmail import (
+    GmailCreateDraft,
+    GmailGetMessage,
+    GmailGetThread,
+    GmailSearch,
+    GmailSendMessage,
+)
 from langchain_community.tools.gmail.utils import build_resource_service, get_gmail_credentials
-from typing import Optional
+from typing import Any, Dict, List, Optional
+from gmail_common import fetch_messages_with_errors
 
 # Initialize FastMCP server
 mcp = FastMCP("gmail")
 
-# Global Gmail toolkit instance
-_gmail_toolkit = None
+# Gmail tool instances keyed by action, built once on first use
+_gmail_tools = None
 
+# Gmail API resource shared by the tools, also used directly for metadata lookups
+_gmail_api = None
 
+# Headers returned by metadata lookups; the field mask drops everything else
+METADATA_HEADERS = ["From", "To", "Subject", "Date"]
+METADATA_FIELDS = "id,threadId,snippet,payload/headers"
 
-def get_gmail_toolkit():
-    """Initialize and return Gmail toolkit (singleton pattern)"""
-    global _gmail_toolkit
+
+
+def get_gmail_tools():
+    """Initialize and return the Gmail tools (singleton pattern)"""
+    global _gmail_tools, _gmail_api
     
-    if _gmail_toolkit is None:
+    if _gmail_tools is None:
         credentials = get_gmail_credentials(
             token_file="token.json",
             scopes=["https://mail.google.com/"],
             client_secrets_file="credentials.json",
         )
-        api_resource = build_resource_service(credentials=credentials)
-        _gmail_toolkit = GmailToolkit(api_resource=api_resource)
+        api_resource = _gmail_api = build_resource_service(credentials=credentials)
+        _gmail_tools = {
+            "search": GmailSearch(api_resource=api_resource),
+            "get_message": GmailGetMessage(api_resource=api_resource),
+            "send": GmailSendMessage(api_resource=api_resource),
+            "draft": GmailCreateDraft(api_resource=api_resource),
+            "thread": GmailGetThread(api_resource=api_resource),
+        }
     
-    return _gmail_toolkit
+    return _gmail_tools
+
+
+def get_messages_metadata(message_ids: List[str]) -> List[Dict[str, Any]]:
+    """Fetches headers and snippet for each message, batching the API calls"""
+    get_gmail_tools()
+    messages, errors = fetch_messages_with_errors(
+        _gmail_api, message_ids,
+        format="metadata", metadataHeaders=METADATA_HEADERS, fields=METADATA_FIELDS
+    )
+    
+    return [
+        {"id": message_ids[index], "error": str(errors[index])} if index in errors else {
+            "id": response["id"],
+            "threadId": response.get("threadId"),
+            "snippet": response.get("snippet", ""),
+            "headers": {h["name"]: h["value"] for h in response.get("payload", {}).get("headers", [])}
+        }
+        for index, response in enumerate(messages)
+    ]
 
 
 @mcp.tool()
-def search_gmail(query: str, max_results: int = 10) -> str:
+def search_gmail(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
     """
     Search Gmail messages using Gmail search syntax.
     
@@ -42,43 +81,45 @@ def search_gmail(query: str, max_results: int = 10) -> str:
         max_results: Maximum number of results to return (default: 10)
     
     Returns:
-        Search results as formatted string
+        List of matching messages
     """
-    toolkit = get_gmail_toolkit()
-    tools = toolkit.get_tools()
-    
-    # Find search tool
-    search_tool = next((t for t in tools if "search" in t.name.lower()), None)
-    
-    if search_tool:
-        result = search_tool.invoke({"query": query, "max_results": max_results})
-        return str(result)
-    
-    return "Search tool not found"
+    search_tool = get_gmail_tools()["search"]
+    result = search_tool.invoke({"query": query, "max_results": max_results})
+    return result
 
 
 @mcp.tool()
-def get_gmail_message(message_id: str) -> str:
+def get_gmail_message(message_id: str, headers_only: bool = False) -> Dict[str, Any]:
     """
     Get the full content of a specific Gmail message by ID.
     
     Args:
         message_id: The unique Gmail message ID
+        headers_only: Return only From/To/Subject/Date and the snippet (default: False)
     
     Returns:
         Full message content including headers, body, and metadata
     """
-    toolkit = get_gmail_toolkit()
-    tools = toolkit.get_tools()
+    if headers_only:
+        return get_messages_metadata([message_id])[0]
     
-    # Find get message tool
-    get_tool = next((t for t in tools if "get" in t.name.lower() and "message" in t.name.lower()), None)
+    get_tool = get_gmail_tools()["get_message"]
+    result = get_tool.invoke({"message_id": message_id})
+    return result
+
+
+@mcp.tool()
+def get_gmail_messages_metadata(message_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Get the headers and snippet of several Gmail messages in one batched request.
     
-    if get_tool:
-        result = get_tool.invoke({"message_id": message_id})
-        return str(result)
+    Args:
+        message_ids: Gmail message IDs (e.g. from search_gmail)
     
-    return "Get message tool not found"
+    Returns:
+        One entry per message with id, threadId, snippet and From/To/Subject/Date headers
+    """
+    return get_messages_metadata(message_ids)
 
 
 @mcp.tool()
@@ -96,27 +137,19 @@ def send_gmail_message(to: str, subject: str, message: str, cc: Optional[str] =
     Returns:
         Confirmation message with sent email details
     """
-    toolkit = get_gmail_toolkit()
-    tools = toolkit.get_tools()
-    
-    # Find send tool
-    send_tool = next((t for t in tools if "send" in t.name.lower()), None)
-    
-    if send_tool:
-        params = {
-            "to": to,
-            "subject": subject,
-            "message": message
-        }
-        if cc:
-            params["cc"] = cc
-        if bcc:
-            params["bcc"] = bcc
-            
-        result = send_tool.invoke(params)
-        return str(result)
-    
-    return "Send tool not found"
+    send_tool = get_gmail_tools()["send"]
+    params = {
+        "to": to,
+        "subject": subject,
+        "message": message
+    }
+    if cc:
+        params["cc"] = cc
+    if bcc:
+        params["bcc"] = bcc
+        
+    result = send_tool.invoke(params)
+    return result
 
 
 @mcp.tool()
@@ -132,25 +165,17 @@ def create_gmail_draft(to: str, subject: str, message: str) -> str:
     Returns:
         Confirmation with draft ID
     """
-    toolkit = get_gmail_toolkit()
-    tools = toolkit.get_tools()
-    
-    # Find draft tool
-    draft_tool = next((t for t in tools if "draft" in t.name.lower()), None)
-    
-    if draft_tool:
-        result = draft_tool.invoke({
-            "to": to,
-            "subject": subject,
-            "message": message
-        })
-        return str(result)
-    
-    return "Draft tool not found"
+    draft_tool = get_gmail_tools()["draft"]
+    result = draft_tool.invoke({
+        "to": to,
+        "subject": subject,
+        "message": message
+    })
+    return result
 
 
 @mcp.tool()
-def get_gmail_thread(thread_id: str) -> str:
+def get_gmail_thread(thread_id: str) -> Dict[str, Any]:
     """
     Get an entire Gmail conversation thread by thread ID.
     
@@ -160,17 +185,9 @@ def get_gmail_thread(thread_id: str) -> str:
     Returns:
         Complete thread with all messages in the conversation
     """
-    toolkit = get_gmail_toolkit()
-    tools = toolkit.get_tools()
-    
-    # Find thread tool
-    thread_tool = next((t for t in tools if "thread" in t.name.lower()), None)
-    
-    if thread_tool:
-        result = thread_tool.invoke({"thread_id": thread_id})
-        return str(result)
-    
-    return "Thread tool not found"
+    thread_tool = get_gmail_tools()["thread"]
+    result = thread_tool.invoke({"thread_id": thread_id})
+    return result
 
 
 if __name__ == "__main__":
@@ -1,6 +1,12 @@
 from mcp.server.fastmcp import FastMCP
-import requests
+import httpx
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from cachetools import TTLCache
+import orjson
+import re
 from typing import Optional, List, Dict, Any
 from urllib.parse import quote
 
@@ -10,17 +16,151 @@ mcp = FastMCP("openstreetmap")
 # Base URLs for OpenStreetMap services
 NOMINATIM_URL = "https://nominatim.openstreetmap.org"
 OVERPASS_URL = "https://overpass-api.de/api/interpreter"
-OSRM_URL = "http://router.project-osrm.org"
+OSRM_URL = "https://router.project-osrm.org"
 
 # User agent (required by Nominatim)
 HEADERS = {
     "User-Agent": "MCP-OpenStreetMap-Server/1.0"
 }
 
+# Shared client so Nominatim, OSRM and Open-Elevation calls reuse pooled
+# connections; over HTTP/2 concurrent lookups multiplex on one TLS connection per host
+session = httpx.Client(
+    headers=HEADERS,
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=8)
+    ),
+    timeout=httpx.Timeout(10.0, connect=3.0)
+)
+
+# The transport only retries failed connections; gateway errors from an
+# overloaded Nominatim/OSRM/Open-Elevation are retried here with backoff
+RETRY_STATUSES = frozenset({502, 503, 504})
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3
+
+def send(method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request on the shared client, retrying 502/503/504 responses with exponential backoff"""
+    for attempt in range(MAX_RETRIES):
+        response = session.request(method, url, **kwargs)
+        if response.status_code not in RETRY_STATUSES:
+            return response
+        time.sleep(RETRY_BACKOFF * 2 ** attempt)
+    return session.request(method, url, **kwargs)
+
+# Time of the last Nominatim request, shared by all tools
+_last_nominatim_call = 0.0
+_rate_limit_lock = threading.Lock()
+
 def rate_limit():
-    """Respect Nominatim's rate limit of 1 request per second"""
-    time.sleep(1)
+    """Respect Nominatim's rate limit of 1 request per second, sleeping only for what is left of the window"""
+    global _last_nominatim_call
+    with _rate_limit_lock:
+        delta = time.monotonic() - _last_nominatim_call
+        if delta < 1.0:
+            time.sleep(1.0 - delta)
+        _last_nominatim_call = time.monotonic()
+
+
+# Workers for concurrent lookups. Nominatim request starts stay spaced by
+# rate_limit(), but each response is awaited in parallel with the next wait
+_request_pool = ThreadPoolExecutor(max_workers=8)
+
+# Recent OSRM responses keyed on path and query; repeated route/matrix calls for
+# the same points within a minute are answered without another round-trip
+_osrm_cache = TTLCache(maxsize=256, ttl=60)
+_osrm_cache_lock = threading.Lock()
+
+def osrm_get(path: str, params: Dict[str, str]) -> Dict[str, Any]:
+    """GET an OSRM endpoint and return the parsed response, served from cache when recent"""
+    key = (path, tuple(sorted(params.items())))
+    with _osrm_cache_lock:
+        cached = _osrm_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    response = send("GET", f"{OSRM_URL}{path}", params=params)
+    response.raise_for_status()
+    result = orjson.loads(response.content)
+    # Only successful lookups are kept so transient failures are retried
+    if result.get("code") == "Ok":
+        with _osrm_cache_lock:
+            _osrm_cache[key] = result
+    return result
+
+
+def geocode_many(addresses: List[str]) -> List[Dict[str, Any]]:
+    """Geocode addresses concurrently, returning maps_geocode results in input order"""
+    # Look up each distinct address once so duplicates don't use up the rate limit
+    unique = list(dict.fromkeys(normalize_address(address) for address in addresses))
+    results = dict(zip(unique, _request_pool.map(maps_geocode, unique)))
+    return [results[normalize_address(address)] for address in addresses]
+
+
+def normalize_address(address: str) -> str:
+    """Collapse case and whitespace so equivalent addresses share a cache entry"""
+    return " ".join(address.lower().split())
+
+
+@lru_cache(maxsize=4096)
+def _geocode(address: str) -> Dict[str, Any]:
+    """Nominatim forward lookup; cached, so repeat addresses skip the rate-limit wait"""
+    rate_limit()
+    url = f"{NOMINATIM_URL}/search"
+    params = {
+        "q": address,
+        "format": "json",
+        "limit": 1
+    }
+    
+    response = send("GET", url, params=params)
+    response.raise_for_status()
+    result = orjson.loads(response.content)
+    
+    if not result:
+        return {"error": "No results found for the given address"}
+    
+    place = result[0]
+    return {
+        "location": {
+            "lat": float(place["lat"]),
+            "lng": float(place["lon"])
+        },
+        "formatted_address": place.get("display_name"),
+        "place_id": place.get("place_id")
+    }
+
+
+@lru_cache(maxsize=4096)
+def _reverse_geocode(latitude: float, longitude: float) -> Dict[str, Any]:
+    """Nominatim reverse lookup; cached per coordinate rounded to ~1 m"""
+    rate_limit()
+    url = f"{NOMINATIM_URL}/reverse"
+    params = {
+        "lat": latitude,
+        "lon": longitude,
+        "format": "json"
+    }
+    
+    response = send("GET", url, params=params)
+    response.raise_for_status()
+    result = orjson.loads(response.content)
+    
+    if "error" in result:
+        return {"error": "No results found for the given coordinates"}
+    
+    address = result.get("address", {})
+    return {
+        "formatted_address": result.get("display_name"),
+        "place_id": result.get("place_id"),
+        "address_components": address
+    }
+
 
+# "lat,lng" inputs need no lookup
+_COORD_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
 
 @mcp.tool()
 def maps_geocode(address: str) -> Dict[str, Any]:
@@ -33,31 +173,19 @@ def maps_geocode(address: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing location (lat/lng), formatted_address, and place_id
     """
+    match = _COORD_RE.match(address)
+    if match:
+        lat, lng = float(match.group(1)), float(match.group(2))
+        if -90 <= lat <= 90 and -180 <= lng <= 180:
+            # Already coordinates: skip the rate-limit wait and the Nominatim call
+            return {
+                "location": {"lat": lat, "lng": lng},
+                "formatted_address": address.strip(),
+                "place_id": None
+            }
+    
     try:
-        rate_limit()
-        url = f"{NOMINATIM_URL}/search"
-        params = {
-            "q": address,
-            "format": "json",
-            "limit": 1
-        }
-        
-        response = requests.get(url, params=params, headers=HEADERS)
-        response.raise_for_status()
-        result = response.json()
-        
-        if not result:
-            return {"error": "No results found for the given address"}
-        
-        place = result[0]
-        return {
-            "location": {
-                "lat": float(place["lat"]),
-                "lng": float(place["lon"])
-            },
-            "formatted_address": place.get("display_name"),
-            "place_id": place.get("place_id")
-        }
+        return _geocode(normalize_address(address))
     except Exception as e:
         return {"error": str(e)}
 
@@ -75,31 +203,25 @@ def maps_reverse_geocode(latitude: float, longitude: float) -> Dict[str, Any]:
         Dictionary containing formatted_address, place_id, and address_components
     """
     try:
-        rate_limit()
-        url = f"{NOMINATIM_URL}/reverse"
-        params = {
-            "lat": latitude,
-            "lon": longitude,
-            "format": "json"
-        }
-        
-        response = requests.get(url, params=params, headers=HEADERS)
-        response.raise_for_status()
-        result = response.json()
-        
-        if "error" in result:
-            return {"error": "No results found for the given coordinates"}
-        
-        address = result.get("address", {})
-        return {
-            "formatted_address": result.get("display_name"),
-            "place_id": result.get("place_id"),
-            "address_components": address
-        }
+        return _reverse_geocode(round(latitude, 5), round(longitude, 5))
     except Exception as e:
         return {"error": str(e)}
 
 
+@mcp.tool()
+def clear_geocode_cache() -> Dict[str, Any]:
+    """
+    Clear cached geocoding and reverse-geocoding results.
+    
+    Returns:
+        Number of cached entries removed
+    """
+    cleared = _geocode.cache_info().currsize + _reverse_geocode.cache_info().currsize
+    _geocode.cache_clear()
+    _reverse_geocode.cache_clear()
+    return {"cleared": cleared}
+
+
 @mcp.tool()
 def maps_search_places(
     query: str,
@@ -132,9 +254,9 @@ def maps_search_places(
             params["lat"] = latitude
             params["lon"] = longitude
         
-        response = requests.get(url, params=params, headers=HEADERS)
+        response = send("GET", url, params=params)
         response.raise_for_status()
-        results = response.json()
+        results = orjson.loads(response.content)
         
         places = []
         for place in results:
@@ -155,55 +277,143 @@ def maps_search_places(
         return [{"error": str(e)}]
 
 
+# Soft cap on queries per batch, to stay polite to the free Nominatim endpoint
+MAX_BATCH_QUERIES = 50
+
+@mcp.tool()
+def maps_search_places_batch(
+    queries: List[str],
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Search for places for several text queries at once.
+    
+    Args:
+        queries: Search queries (e.g., ["pizza", "museum"]), at most 50
+        latitude: Optional latitude for location-biased search
+        longitude: Optional longitude for location-biased search
+    
+    Returns:
+        Dictionary mapping each query to its list of places
+    """
+    if len(queries) > MAX_BATCH_QUERIES:
+        return {"error": f"At most {MAX_BATCH_QUERIES} queries per batch"}
+    
+    unique = list(dict.fromkeys(queries))
+    results = _request_pool.map(
+        lambda query: maps_search_places(query, latitude, longitude), unique
+    )
+    return dict(zip(unique, results))
+
+
+def osm_id(place_id: str) -> str:
+    """Normalize a place ID to Nominatim's typed form, defaulting bare IDs to nodes (123 -> N123)"""
+    place_id = str(place_id).strip()
+    if place_id[:1].upper() in ("N", "W", "R"):
+        return place_id[0].upper() + place_id[1:]
+    return f"N{place_id}"
+
+
+def format_place_details(place: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a Nominatim lookup result into the place details returned by the tools"""
+    extratags = place.get("extratags") or {}
+    return {
+        "name": place.get("name", place.get("display_name").split(",")[0]),
+        "formatted_address": place.get("display_name"),
+        "phone": extratags.get("phone", extratags.get("contact:phone")),
+        "website": extratags.get("website", extratags.get("contact:website")),
+        "location": {
+            "lat": float(place["lat"]),
+            "lng": float(place["lon"])
+        },
+        "type": place.get("type"),
+        "category": place.get("category"),
+        "opening_hours": extratags.get("opening_hours"),
+        "address_components": place.get("address", {})
+    }
+
+
+# Nominatim /lookup accepts at most this many OSM IDs per request
+MAX_LOOKUP_IDS = 50
+
+def _lookup_places(osm_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Look up typed OSM IDs in one Nominatim request, keyed by typed ID"""
+    rate_limit()
+    params = {
+        "osm_ids": ",".join(osm_ids),
+        "format": "json",
+        "addressdetails": 1,
+        "extratags": 1
+    }
+    
+    response = send("GET", f"{NOMINATIM_URL}/lookup", params=params)
+    response.raise_for_status()
+    return {
+        f"{place['osm_type'][0].upper()}{place['osm_id']}": format_place_details(place)
+        for place in orjson.loads(response.content)
+    }
+
+
 @mcp.tool()
 def maps_place_details(place_id: str) -> Dict[str, Any]:
     """
     Get detailed information about a specific place.
     
     Args:
-        place_id: The OpenStreetMap place ID
+        place_id: The OpenStreetMap ID, optionally prefixed with its type
+                  (N = node, W = way, R = relation); bare IDs are treated as nodes
     
     Returns:
         Detailed place information including name, address, and available metadata
     """
     try:
-        rate_limit()
-        url = f"{NOMINATIM_URL}/lookup"
-        params = {
-            "osm_ids": f"N{place_id}",
-            "format": "json",
-            "addressdetails": 1,
-            "extratags": 1
-        }
-        
-        response = requests.get(url, params=params, headers=HEADERS)
-        response.raise_for_status()
-        result = response.json()
-        
-        if not result:
-            return {"error": "Place not found"}
-        
-        place = result[0]
-        extratags = place.get("extratags", {})
-        
-        return {
-            "name": place.get("name", place.get("display_name").split(",")[0]),
-            "formatted_address": place.get("display_name"),
-            "phone": extratags.get("phone", extratags.get("contact:phone")),
-            "website": extratags.get("website", extratags.get("contact:website")),
-            "location": {
-                "lat": float(place["lat"]),
-                "lng": float(place["lon"])
-            },
-            "type": place.get("type"),
-            "category": place.get("category"),
-            "opening_hours": extratags.get("opening_hours"),
-            "address_components": place.get("address", {})
-        }
+        typed_id = osm_id(place_id)
+        return _lookup_places([typed_id]).get(typed_id, {"error": "Place not found"})
     except Exception as e:
         return {"error": str(e)}
 
 
+@mcp.tool()
+def maps_place_details_batch(place_ids: List[str]) -> Dict[str, Any]:
+    """
+    Get detailed information about several places, 50 per Nominatim request.
+    
+    Args:
+        place_ids: OpenStreetMap IDs, optionally prefixed with their type (e.g., ["W12345", "240109189"])
+    
+    Returns:
+        Dictionary mapping each place ID to its details
+    """
+    typed_ids = {place_id: osm_id(place_id) for place_id in place_ids}
+    unique = list(dict.fromkeys(typed_ids.values()))
+    chunks = [unique[i:i + MAX_LOOKUP_IDS] for i in range(0, len(unique), MAX_LOOKUP_IDS)]
+    
+    def lookup_chunk(chunk):
+        try:
+            return _lookup_places(chunk)
+        except Exception as e:
+            return {typed_id: {"error": str(e)} for typed_id in chunk}
+    
+    # Request starts stay spaced by rate_limit(); responses are awaited in parallel
+    places = {}
+    for found in _request_pool.map(lookup_chunk, chunks):
+        places.update(found)
+    
+    return {
+        place_id: places.get(typed_id, {"error": "Place not found"})
+        for place_id, typed_id in typed_ids.items()
+    }
+
+
+def distance_duration(meters: float, seconds: float) -> Dict[str, Dict[str, Any]]:
+    """Format an OSRM distance/duration pair as km and minutes alongside the raw values"""
+    return {
+        "distance": {"text": f"{meters / 1000:.1f} km", "value": meters},
+        "duration": {"text": f"{seconds / 60:.0f} mins", "value": seconds}
+    }
+
+
 @mcp.tool()
 def maps_distance_matrix(
     origins: List[str],
@@ -223,19 +433,15 @@ def maps_distance_matrix(
     """
     try:
         # First geocode all origins and destinations
-        origin_coords = []
-        for origin in origins:
-            rate_limit()
-            geocode_result = maps_geocode(origin)
-            if "error" not in geocode_result:
-                origin_coords.append(geocode_result["location"])
-        
-        dest_coords = []
-        for dest in destinations:
-            rate_limit()
-            geocode_result = maps_geocode(dest)
-            if "error" not in geocode_result:
-                dest_coords.append(geocode_result["location"])
+        geocode_results = geocode_many(origins + destinations)
+        origin_coords = [
+            result["location"] for result in geocode_results[:len(origins)]
+            if "error" not in result
+        ]
+        dest_coords = [
+            result["location"] for result in geocode_results[len(origins):]
+            if "error" not in result
+        ]
         
         # Map mode to OSRM profile
         mode_map = {
@@ -245,37 +451,40 @@ def maps_distance_matrix(
         }
         profile = mode_map.get(mode, "car")
         
-        rows = []
-        for origin in origin_coords:
-            elements = []
-            for dest in dest_coords:
-                try:
-                    url = f"{OSRM_URL}/route/v1/{profile}/{origin['lng']},{origin['lat']};{dest['lng']},{dest['lat']}"
-                    params = {"overview": "false"}
-                    
-                    response = requests.get(url, params=params)
-                    response.raise_for_status()
-                    result = response.json()
-                    
-                    if result.get("code") == "Ok" and result.get("routes"):
-                        route = result["routes"][0]
-                        elements.append({
-                            "distance": {
-                                "text": f"{route['distance']/1000:.1f} km",
-                                "value": route["distance"]
-                            },
-                            "duration": {
-                                "text": f"{route['duration']/60:.0f} mins",
-                                "value": route["duration"]
-                            },
-                            "status": "OK"
-                        })
-                    else:
-                        elements.append({"status": "NOT_FOUND"})
-                except:
-                    elements.append({"status": "ERROR"})
-            
-            rows.append({"elements": elements})
+        # One OSRM table request returns the whole origin x destination matrix
+        durations = distances = None
+        table_error = False
+        if origin_coords and dest_coords:
+            points = origin_coords + dest_coords
+            coords = ";".join(f"{point['lng']},{point['lat']}" for point in points)
+            params = {
+                "sources": ";".join(str(i) for i in range(len(origin_coords))),
+                "destinations": ";".join(str(i) for i in range(len(origin_coords), len(points))),
+                "annotations": "duration,distance"
+            }
+            try:
+                result = osrm_get(f"/table/v1/{profile}/{coords}", params)
+                if result.get("code") == "Ok":
+                    durations = result["durations"]
+                    distances = result["distances"]
+            except Exception:
+                table_error = True
+        
+        if table_error or durations is None:
+            status = "ERROR" if table_error else "NOT_FOUND"
+            rows = [
+                {"elements": [{"status": status} for _ in dest_coords]}
+                for _ in origin_coords
+            ]
+        else:
+            rows = [
+                {"elements": [
+                    {**distance_duration(distance, duration), "status": "OK"}
+                    if duration is not None else {"status": "NOT_FOUND"}
+                    for distance, duration in zip(distance_row, duration_row)
+                ]}
+                for distance_row, duration_row in zip(distances, durations)
+            ]
         
         return {
             "origin_addresses": origins,
@@ -286,6 +495,23 @@ def maps_distance_matrix(
         return {"error": str(e)}
 
 
+ELEVATION_URL = "https://api.open-elevation.com/api/v1/lookup"
+
+# Open-Elevation rejects very large request bodies, so big lists are split up
+ELEVATION_CHUNK_SIZE = 512
+
+def _lookup_elevation(locations: List[Dict[str, float]]) -> List[Dict[str, Any]]:
+    """POST one chunk of locations to Open-Elevation and return its results"""
+    response = send(
+        "POST",
+        ELEVATION_URL,
+        content=orjson.dumps({"locations": locations}),
+        headers={"Content-Type": "application/json"}
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content).get("results", [])
+
+
 @mcp.tool()
 def maps_elevation(locations: List[Dict[str, float]]) -> List[Dict[str, Any]]:
     """
@@ -298,17 +524,16 @@ def maps_elevation(locations: List[Dict[str, float]]) -> List[Dict[str, Any]]:
         List of elevation data for each location
     """
     try:
-        url = "https://api.open-elevation.com/api/v1/lookup"
-        
         locations_param = [
             {"latitude": loc["latitude"], "longitude": loc["longitude"]}
             for loc in locations
         ]
+        chunks = [
+            locations_param[i:i + ELEVATION_CHUNK_SIZE]
+            for i in range(0, len(locations_param), ELEVATION_CHUNK_SIZE)
+        ]
         
-        response = requests.post(url, json={"locations": locations_param})
-        response.raise_for_status()
-        result = response.json()
-        
+        # Chunks are posted concurrently; map() keeps them in input order
         return [
             {
                 "elevation": point["elevation"],
@@ -317,7 +542,8 @@ def maps_elevation(locations: List[Dict[str, float]]) -> List[Dict[str, Any]]:
                     "lng": point["longitude"]
                 }
             }
-            for point in result.get("results", [])
+            for points in _request_pool.map(_lookup_elevation, chunks)
+            for point in points
         ]
     except Exception as e:
         return [{"error": str(e)}]
@@ -327,7 +553,8 @@ def maps_elevation(locations: List[Dict[str, float]]) -> List[Dict[str, Any]]:
 def maps_directions(
     origin: str,
     destination: str,
-    mode: str = "driving"
+    mode: str = "driving",
+    include_geometry: bool = False
 ) -> Dict[str, Any]:
     """
     Get directions between two points.
@@ -336,19 +563,17 @@ def maps_directions(
         origin: Starting address or coordinates
         destination: Ending address or coordinates
         mode: Travel mode - "driving", "walking", "bicycling" (transit not supported)
+        include_geometry: Also return a simplified route outline as an encoded polyline
     
     Returns:
         Detailed route information with steps, distance, and duration
     """
     try:
-        # Geocode origin and destination
-        rate_limit()
-        origin_geo = maps_geocode(origin)
+        # Geocode origin and destination (maps_geocode applies the rate limit)
+        origin_geo, dest_geo = geocode_many([origin, destination])
         if "error" in origin_geo:
             return {"error": f"Could not geocode origin: {origin}"}
         
-        rate_limit()
-        dest_geo = maps_geocode(destination)
         if "error" in dest_geo:
             return {"error": f"Could not geocode destination: {destination}"}
         
@@ -363,16 +588,16 @@ def maps_directions(
         origin_loc = origin_geo["location"]
         dest_loc = dest_geo["location"]
         
-        url = f"{OSRM_URL}/route/v1/{profile}/{origin_loc['lng']},{origin_loc['lat']};{dest_loc['lng']},{dest_loc['lat']}"
+        path = f"/route/v1/{profile}/{origin_loc['lng']},{origin_loc['lat']};{dest_loc['lng']},{dest_loc['lat']}"
+        # Steps only need names, distances and durations: skip the route overview unless
+        # asked for, and keep geometries as compact polyline strings instead of GeoJSON arrays
         params = {
-            "overview": "full",
+            "overview": "simplified" if include_geometry else "false",
             "steps": "true",
-            "geometries": "geojson"
+            "geometries": "polyline"
         }
         
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        result = response.json()
+        result = osrm_get(path, params)
         
         if result.get("code") != "Ok" or not result.get("routes"):
             return {"error": "No route found"}
@@ -380,37 +605,28 @@ def maps_directions(
         route = result["routes"][0]
         leg = route["legs"][0]
         
-        steps = []
-        for step in leg.get("steps", []):
-            steps.append({
+        travel_mode = mode.upper()
+        steps = [
+            {
                 "instruction": step.get("name", "Continue"),
-                "distance": {
-                    "text": f"{step['distance']/1000:.1f} km",
-                    "value": step["distance"]
-                },
-                "duration": {
-                    "text": f"{step['duration']/60:.0f} mins",
-                    "value": step["duration"]
-                },
-                "travel_mode": mode.upper()
-            })
+                **distance_duration(step["distance"], step["duration"]),
+                "travel_mode": travel_mode
+            }
+            for step in leg.get("steps", ())
+        ]
         
-        return {
+        directions = {
             "summary": f"Route via {profile}",
-            "distance": {
-                "text": f"{route['distance']/1000:.1f} km",
-                "value": route["distance"]
-            },
-            "duration": {
-                "text": f"{route['duration']/60:.0f} mins",
-                "value": route["duration"]
-            },
+            **distance_duration(route["distance"], route["duration"]),
             "start_address": origin_geo["formatted_address"],
             "end_address": dest_geo["formatted_address"],
             "start_location": origin_loc,
             "end_location": dest_loc,
             "steps": steps
         }
+        if include_geometry:
+            directions["overview_polyline"] = route.get("geometry")
+        return directions
     except Exception as e:
         return {"error": str(e)}
 
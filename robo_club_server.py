@@ -1,12 +1,19 @@
 from mcp.server.fastmcp import FastMCP
 import os
-from typing import Optional, List, Dict, Any
-from dotenv import load_dotenv
+from typing import Optional, List, Dict, Any, Tuple
 from google.oauth2.service_account import Credentials as ServiceAccountCredentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+from google_auth_httplib2 import AuthorizedHttp
+from functools import lru_cache
+from cachetools import TTLCache
 from datetime import datetime, timedelta
 import re
+import orjson
+import time
+import random
+from dotenv import load_dotenv
 
 load_dotenv()
 
@@ -15,6 +22,7 @@ mcp = FastMCP("google-sheets-manager")
 # Google Sheets API Setup
 SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE", "service_account.json")
 
+@lru_cache(maxsize=1)
 def get_sheets_service():
     """Initialize Google Sheets API service with error handling"""
     try:
@@ -25,13 +33,73 @@ def get_sheets_service():
             SERVICE_ACCOUNT_FILE,
             scopes=['https://www.googleapis.com/auth/spreadsheets']
         )
-        return build('sheets', 'v4', credentials=creds)
+        # Bundled discovery document avoids a network fetch on every start, and
+        # one authorized keep-alive connection is shared by all requests
+        return build(
+            'sheets', 'v4',
+            http=AuthorizedHttp(creds, http=build_http()),
+            cache_discovery=False,
+            static_discovery=True
+        )
     except Exception as e:
         raise Exception(f"Failed to initialize Google Sheets API: {str(e)}")
 
 # Initialize service
 service = get_sheets_service()
 
+# Retries with exponential backoff on 429/5xx for calls that are safe to repeat
+# (reads and overwrites); creates, appends and sheet changes use execute_once
+SHEETS_NUM_RETRIES = int(os.getenv("SHEETS_NUM_RETRIES", "3"))
+
+
+def execute_once(request):
+    """
+    Execute a request that must not be applied twice. Only 429 responses are
+    retried (with jittered backoff), since the API rejected those without
+    applying them; a 5xx may have been applied, so it is returned as an error.
+    """
+    for attempt in range(SHEETS_NUM_RETRIES + 1):
+        try:
+            return request.execute()
+        except HttpError as e:
+            if e.resp.status != 429 or attempt == SHEETS_NUM_RETRIES:
+                raise
+            time.sleep(min(2 ** attempt, 16) + random.random())
+
+# Sheet title -> sheetId per spreadsheet, so tools that address a sheet by name
+# don't re-fetch spreadsheet metadata each time. Dropped whenever sheets change.
+_sheet_id_cache = TTLCache(maxsize=256, ttl=60)
+
+
+def get_sheet_id(spreadsheet_id: str, sheet_name: str) -> Optional[int]:
+    """Returns the sheetId for a sheet title, or None if the spreadsheet has no such sheet"""
+    sheet_ids = _sheet_id_cache.get(spreadsheet_id)
+    if sheet_ids is None or sheet_name not in sheet_ids:
+        # Only sheet ids and titles are needed, not the full spreadsheet metadata
+        spreadsheet = service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields="sheets.properties(sheetId,title)"
+        ).execute(num_retries=SHEETS_NUM_RETRIES)
+        sheet_ids = _sheet_id_cache[spreadsheet_id] = {
+            sheet['properties']['title']: sheet['properties']['sheetId']
+            for sheet in spreadsheet.get('sheets', [])
+        }
+    return sheet_ids.get(sheet_name)
+
+
+@lru_cache(maxsize=1024)
+def column_letter(column: int) -> str:
+    """Converts a 1-based column number to its A1 letters (1 -> A, 27 -> AA)"""
+    letters = ""
+    while column > 0:
+        column, remainder = divmod(column - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+# Metadata fields read by get_spreadsheet_info; everything else is left out of the response
+SPREADSHEET_INFO_FIELDS = ("spreadsheetId,spreadsheetUrl,properties.title,"
+                           "sheets.properties(sheetId,title,index,gridProperties(rowCount,columnCount))")
+
 # ======================================================================
 # CORE SPREADSHEET OPERATIONS
 # ======================================================================
@@ -63,7 +131,16 @@ def create_spreadsheet(title: str, sheet_names: Optional[List[str]] = None) -> D
             "sheets": sheets
         }
         
-        result = service.spreadsheets().create(body=spreadsheet).execute()
+        result = execute_once(service.spreadsheets().create(
+            body=spreadsheet,
+            fields="spreadsheetId,spreadsheetUrl,sheets.properties(sheetId,title)"
+        ))
+        
+        # Seed the sheet-id cache so later tools on this spreadsheet skip the metadata fetch
+        _sheet_id_cache[result["spreadsheetId"]] = {
+            sheet['properties']['title']: sheet['properties']['sheetId']
+            for sheet in result.get('sheets', [])
+        }
         
         return {
             "success": True,
@@ -89,7 +166,10 @@ def get_spreadsheet_info(spreadsheet_id: str) -> Dict[str, Any]:
         Information about the spreadsheet and its sheets
     """
     try:
-        spreadsheet = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
+        spreadsheet = service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields=SPREADSHEET_INFO_FIELDS
+        ).execute(num_retries=SHEETS_NUM_RETRIES)
         
         sheets_info = []
         for sheet in spreadsheet.get('sheets', []):
@@ -149,12 +229,13 @@ def create_sheet(spreadsheet_id: str, sheet_name: str, row_count: int = 1000, co
             }]
         }
         
-        response = service.spreadsheets().batchUpdate(
+        response = execute_once(service.spreadsheets().batchUpdate(
             spreadsheetId=spreadsheet_id,
             body=request_body
-        ).execute()
+        ))
         
         sheet_id = response['replies'][0]['addSheet']['properties']['sheetId']
+        _sheet_id_cache.pop(spreadsheet_id, None)
         
         return {
             "success": True,
@@ -179,13 +260,7 @@ def delete_sheet(spreadsheet_id: str, sheet_name: str) -> Dict[str, Any]:
     """
     try:
         # Get sheet ID from name
-        spreadsheet = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-        sheet_id = None
-        
-        for sheet in spreadsheet['sheets']:
-            if sheet['properties']['title'] == sheet_name:
-                sheet_id = sheet['properties']['sheetId']
-                break
+        sheet_id = get_sheet_id(spreadsheet_id, sheet_name)
         
         if sheet_id is None:
             return {"success": False, "error": f"Sheet '{sheet_name}' not found"}
@@ -198,10 +273,11 @@ def delete_sheet(spreadsheet_id: str, sheet_name: str) -> Dict[str, Any]:
             }]
         }
         
-        service.spreadsheets().batchUpdate(
+        execute_once(service.spreadsheets().batchUpdate(
             spreadsheetId=spreadsheet_id,
             body=request_body
-        ).execute()
+        ))
+        _sheet_id_cache.pop(spreadsheet_id, None)
         
         return {
             "success": True,
@@ -225,13 +301,7 @@ def rename_sheet(spreadsheet_id: str, old_name: str, new_name: str) -> Dict[str,
     """
     try:
         # Get sheet ID from name
-        spreadsheet = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-        sheet_id = None
-        
-        for sheet in spreadsheet['sheets']:
-            if sheet['properties']['title'] == old_name:
-                sheet_id = sheet['properties']['sheetId']
-                break
+        sheet_id = get_sheet_id(spreadsheet_id, old_name)
         
         if sheet_id is None:
             return {"success": False, "error": f"Sheet '{old_name}' not found"}
@@ -248,10 +318,11 @@ def rename_sheet(spreadsheet_id: str, old_name: str, new_name: str) -> Dict[str,
             }]
         }
         
-        service.spreadsheets().batchUpdate(
+        execute_once(service.spreadsheets().batchUpdate(
             spreadsheetId=spreadsheet_id,
             body=request_body
-        ).execute()
+        ))
+        _sheet_id_cache.pop(spreadsheet_id, None)
         
         return {
             "success": True,
@@ -268,13 +339,15 @@ def rename_sheet(spreadsheet_id: str, old_name: str, new_name: str) -> Dict[str,
 # ======================================================================
 
 @mcp.tool()
-def read_range(spreadsheet_id: str, range_name: str) -> Dict[str, Any]:
+def read_range(spreadsheet_id: str, range_name: str, value_render_option: str = "UNFORMATTED_VALUE") -> Dict[str, Any]:
     """
     Read data from a specific range in a sheet.
     
     Args:
         spreadsheet_id: Google Sheet ID
         range_name: Range in A1 notation (e.g., "Sheet1!A1:D10" or "Attendance!A:D")
+        value_render_option: "UNFORMATTED_VALUE" (numbers as numbers), "FORMATTED_VALUE"
+                             (as displayed) or "FORMULA"
     
     Returns:
         Data from the specified range
@@ -285,8 +358,11 @@ def read_range(spreadsheet_id: str, range_name: str) -> Dict[str, Any]:
     try:
         result = service.spreadsheets().values().get(
             spreadsheetId=spreadsheet_id,
-            range=range_name
-        ).execute()
+            range=range_name,
+            valueRenderOption=value_render_option,
+            dateTimeRenderOption="FORMATTED_STRING",
+            fields="values"
+        ).execute(num_retries=SHEETS_NUM_RETRIES)
         
         values = result.get('values', [])
         
@@ -304,34 +380,36 @@ def read_range(spreadsheet_id: str, range_name: str) -> Dict[str, Any]:
 
 
 @mcp.tool()
-def read_entire_sheet(spreadsheet_id: str, sheet_name: str) -> Dict[str, Any]:
+def read_entire_sheet(spreadsheet_id: str, sheet_name: str, value_render_option: str = "UNFORMATTED_VALUE") -> Dict[str, Any]:
     """
     Read all data from a sheet.
     
     Args:
         spreadsheet_id: Google Sheet ID
         sheet_name: Name of the sheet to read
+        value_render_option: How values are returned (see read_range)
     
     Returns:
         All data from the sheet
     """
-    return read_range(spreadsheet_id, f"{sheet_name}")
+    return read_range(spreadsheet_id, f"{sheet_name}", value_render_option)
 
 
 @mcp.tool()
-def read_with_headers(spreadsheet_id: str, sheet_name: str) -> Dict[str, Any]:
+def read_with_headers(spreadsheet_id: str, sheet_name: str, value_render_option: str = "UNFORMATTED_VALUE") -> Dict[str, Any]:
     """
     Read data from a sheet and parse it with headers (first row as keys).
     
     Args:
         spreadsheet_id: Google Sheet ID
         sheet_name: Name of the sheet
+        value_render_option: How values are returned (see read_range)
     
     Returns:
         Data as list of dictionaries with headers as keys
     """
     try:
-        result = read_range(spreadsheet_id, sheet_name)
+        result = read_range(spreadsheet_id, sheet_name, value_render_option)
         
         if not result.get("success"):
             return result
@@ -347,13 +425,10 @@ def read_with_headers(spreadsheet_id: str, sheet_name: str) -> Dict[str, Any]:
             }
         
         headers = data[0]
-        rows = []
+        width = len(headers)
         
-        for row_data in data[1:]:
-            row_dict = {}
-            for i, header in enumerate(headers):
-                row_dict[header] = row_data[i] if i < len(row_data) else ""
-            rows.append(row_dict)
+        # The API drops trailing empty cells, so pad short rows before zipping
+        rows = [dict(zip(headers, row_data + [""] * (width - len(row_data)))) for row_data in data[1:]]
         
         return {
             "success": True,
@@ -365,6 +440,121 @@ def read_with_headers(spreadsheet_id: str, sheet_name: str) -> Dict[str, Any]:
         return {"success": False, "error": f"Error: {str(e)}"}
 
 
+@mcp.tool()
+def read_ranges(spreadsheet_id: str, range_names: List[str]) -> Dict[str, Any]:
+    """
+    Read several ranges in a single API request.
+    
+    Args:
+        spreadsheet_id: Google Sheet ID
+        range_names: Ranges in A1 notation (e.g., ["Attendance!A1:D10", "Inventory!A:C"])
+    
+    Returns:
+        Data for each range, keyed by the requested range name
+    
+    Example:
+        read_ranges("SHEET_ID", ["Attendance!A1:D100", "Schedule!A1:C20"])
+    """
+    try:
+        result = service.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=range_names,
+            fields="valueRanges(values)"
+        ).execute(num_retries=SHEETS_NUM_RETRIES)
+        
+        # valueRanges come back in request order
+        return {
+            "success": True,
+            "ranges": {
+                range_name: value_range.get('values', [])
+                for range_name, value_range in zip(range_names, result.get('valueRanges', []))
+            }
+        }
+    except HttpError as e:
+        return {"success": False, "error": f"API error: {str(e)}"}
+    except Exception as e:
+        return {"success": False, "error": f"Error: {str(e)}"}
+
+
+@mcp.tool()
+def query_sheet(spreadsheet_id: str, sheet_name: str, filters: Dict[str, Any], columns: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Return the rows of a sheet whose columns match the given values, reading only
+    the columns involved instead of the whole sheet (first row is the header).
+    
+    Args:
+        spreadsheet_id: Google Sheet ID
+        sheet_name: Name of the sheet
+        filters: Header name -> value a row must have (e.g., {"Status": "Present"})
+        columns: Header names to return (default: all filtered and requested columns)
+    
+    Returns:
+        Matching rows as dictionaries with only the requested columns
+    
+    Example:
+        query_sheet("SHEET_ID", "Attendance", {"Status": "Absent"}, ["Date", "Member Name"])
+    """
+    try:
+        header_result = service.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=f"{sheet_name}!1:1",
+            fields="values"
+        ).execute(num_retries=SHEETS_NUM_RETRIES)
+        headers = header_result.get('values', [[]])[0] if header_result.get('values') else []
+        positions = {header: index for index, header in enumerate(headers)}
+        
+        columns = columns or headers
+        wanted = list(dict.fromkeys([*filters, *columns]))
+        missing = [name for name in wanted if name not in positions]
+        if missing:
+            return {"success": False, "error": f"Columns not found in '{sheet_name}': {missing}"}
+        
+        # One column range per needed header, fetched together and read column-major
+        result = service.spreadsheets().values().batchGetByDataFilter(
+            spreadsheetId=spreadsheet_id,
+            body={
+                "dataFilters": [
+                    {"a1Range": f"{sheet_name}!{column_letter(positions[name] + 1)}2:{column_letter(positions[name] + 1)}"}
+                    for name in wanted
+                ],
+                "majorDimension": "COLUMNS",
+                "valueRenderOption": "UNFORMATTED_VALUE",
+                "dateTimeRenderOption": "FORMATTED_STRING"
+            },
+            fields="valueRanges(valueRange(values))"
+        ).execute(num_retries=SHEETS_NUM_RETRIES)
+        
+        column_values = {}
+        for name, matched in zip(wanted, result.get('valueRanges', [])):
+            values = matched.get('valueRange', {}).get('values', [])
+            column_values[name] = values[0] if values else []
+        row_count = max((len(values) for values in column_values.values()), default=0)
+        
+        def cell(name, row):
+            values = column_values[name]
+            return values[row] if row < len(values) else ""
+        
+        # Unformatted numbers are compared as text too, so {"Quantity": "5"} matches 5
+        rows = [
+            {name: cell(name, row) for name in columns}
+            for row in range(row_count)
+            if all(cell(name, row) == value or str(cell(name, row)) == str(value)
+                   for name, value in filters.items())
+        ]
+        
+        return {
+            "success": True,
+            "sheet_name": sheet_name,
+            "columns": columns,
+            "data": rows,
+            "row_count": len(rows)
+        }
+    except HttpError as e:
+        return {"success": False, "error": f"API error: {str(e)}"}
+    except Exception as e:
+        return {"success": False, "error": f"Error: {str(e)}"}
+
+
 # ======================================================================
 # DATA OPERATIONS - WRITE
 # ======================================================================
@@ -390,8 +580,9 @@ def write_range(spreadsheet_id: str, range_name: str, values: List[List[Any]], v
             spreadsheetId=spreadsheet_id,
             range=range_name,
             valueInputOption=value_input_option,
-            body=body
-        ).execute()
+            body=body,
+            fields="updatedCells,updatedRows,updatedColumns"
+        ).execute(num_retries=SHEETS_NUM_RETRIES)
         
         return {
             "success": True,
@@ -406,6 +597,44 @@ def write_range(spreadsheet_id: str, range_name: str, values: List[List[Any]], v
         return {"success": False, "error": f"Error: {str(e)}"}
 
 
+@mcp.tool()
+def write_ranges(spreadsheet_id: str, data: Dict[str, List[List[Any]]], value_input_option: str = "RAW") -> Dict[str, Any]:
+    """
+    Write data to several ranges in a single API request.
+    
+    Args:
+        spreadsheet_id: Google Sheet ID
+        data: Mapping of range in A1 notation to the 2D list of values to write there
+        value_input_option: "RAW" or "USER_ENTERED" (formulas will be evaluated)
+    
+    Example:
+        write_ranges("SHEET_ID", {"Sheet1!A1:B1": [["Name", "Age"]], "Sheet2!A1": [["Total"]]})
+    """
+    try:
+        body = {
+            "valueInputOption": value_input_option,
+            "data": [{"range": range_name, "values": values} for range_name, values in data.items()]
+        }
+        
+        result = service.spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body=body,
+            fields="totalUpdatedCells,totalUpdatedRows,responses(updatedRange)"
+        ).execute(num_retries=SHEETS_NUM_RETRIES)
+        
+        return {
+            "success": True,
+            "updated_cells": result.get('totalUpdatedCells'),
+            "updated_rows": result.get('totalUpdatedRows'),
+            "updated_ranges": len(result.get('responses', [])),
+            "message": f"Data written to {len(data)} range(s)"
+        }
+    except HttpError as e:
+        return {"success": False, "error": f"API error: {str(e)}"}
+    except Exception as e:
+        return {"success": False, "error": f"Error: {str(e)}"}
+
+
 @mcp.tool()
 def append_rows(spreadsheet_id: str, sheet_name: str, values: List[List[Any]], value_input_option: str = "RAW") -> Dict[str, Any]:
     """
@@ -423,12 +652,13 @@ def append_rows(spreadsheet_id: str, sheet_name: str, values: List[List[Any]], v
     try:
         body = {"values": values}
         
-        result = service.spreadsheets().values().append(
+        result = execute_once(service.spreadsheets().values().append(
             spreadsheetId=spreadsheet_id,
             range=f"{sheet_name}!A:A",
             valueInputOption=value_input_option,
-            body=body
-        ).execute()
+            body=body,
+            fields="updates(updatedRange,updatedRows)"
+        ))
         
         return {
             "success": True,
@@ -457,8 +687,9 @@ def set_headers(spreadsheet_id: str, sheet_name: str, headers: List[str]) -> Dic
     """
     return write_range(
         spreadsheet_id, 
-        f"{sheet_name}!A1:{chr(64 + len(headers))}1", 
-        [headers]
+        f"{sheet_name}!A1:{column_letter(len(headers))}1", 
+        [headers],
+        value_input_option="RAW"
     )
 
 
@@ -476,7 +707,7 @@ def clear_range(spreadsheet_id: str, range_name: str) -> Dict[str, Any]:
             spreadsheetId=spreadsheet_id,
             range=range_name,
             body={}
-        ).execute()
+        ).execute(num_retries=SHEETS_NUM_RETRIES)
         
         return {
             "success": True,
@@ -522,44 +753,83 @@ def update_cell(spreadsheet_id: str, sheet_name: str, cell: str, value: Any, val
     return write_range(spreadsheet_id, f"{sheet_name}!{cell}", [[value]], value_input_option)
 
 
+# Sheets rejects request bodies over 10 MB, so large batch_update calls are split
+# into requests under this size (leaving room for the envelope) or entry count
+MAX_BATCH_BYTES = 9 * 1024 * 1024
+MAX_BATCH_ENTRIES = 1000
+
 @mcp.tool()
-def batch_update(spreadsheet_id: str, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+def batch_update(spreadsheet_id: str, updates: List[Dict[str, Any]], value_input_option: str = "RAW") -> Dict[str, Any]:
     """
-    Perform multiple updates in a single request.
+    Perform multiple updates, in as few requests as the size limits allow.
+    
+    Updates are split across requests when they exceed the size limits or change
+    value_input_option, so the whole call is not atomic. On failure the result
+    reports what was already written and the index of the first update that wasn't.
     
     Args:
         spreadsheet_id: Google Sheet ID
-        updates: List of update dictionaries with 'range' and 'values' keys
+        updates: List of update dictionaries with 'range' and 'values' keys, and an optional
+                 'value_input_option' ("RAW" or "USER_ENTERED") overriding the default
+        value_input_option: Default input option for updates that don't set their own
     
     Example:
         batch_update("SHEET_ID", [
             {"range": "Sheet1!A1", "values": [["Name"]]},
-            {"range": "Sheet1!B1", "values": [["Age"]]}
+            {"range": "Sheet1!B1", "values": [["=SUM(C1:C10)"]], "value_input_option": "USER_ENTERED"}
         ])
     """
     try:
-        data = []
+        # The input option applies per request, so consecutive updates sharing one
+        # are packed together; order is kept in case ranges overlap
+        batches = []
+        batch_option = None
+        batch_bytes = 0
         for update in updates:
-            data.append({
-                'range': update['range'],
-                'values': update['values']
-            })
-        
-        body = {
-            'valueInputOption': 'RAW',
-            'data': data
-        }
-        
-        result = service.spreadsheets().values().batchUpdate(
-            spreadsheetId=spreadsheet_id,
-            body=body
-        ).execute()
+            option = update.get('value_input_option', value_input_option)
+            entry = {'range': update['range'], 'values': update['values']}
+            entry_bytes = len(orjson.dumps(entry))
+            if (not batches or option != batch_option
+                    or len(batches[-1][1]) >= MAX_BATCH_ENTRIES
+                    or batch_bytes + entry_bytes > MAX_BATCH_BYTES):
+                batches.append((option, []))
+                batch_option = option
+                batch_bytes = 0
+            batches[-1][1].append(entry)
+            batch_bytes += entry_bytes
+        
+        total_cells = total_rows = responses = applied = requests = 0
+        try:
+            for option, data in batches:
+                result = service.spreadsheets().values().batchUpdate(
+                    spreadsheetId=spreadsheet_id,
+                    body={'valueInputOption': option, 'data': data},
+                    fields="totalUpdatedCells,totalUpdatedRows,responses(updatedRange)"
+                ).execute(num_retries=SHEETS_NUM_RETRIES)
+                total_cells += result.get('totalUpdatedCells', 0)
+                total_rows += result.get('totalUpdatedRows', 0)
+                responses += len(result.get('responses', []))
+                applied += len(data)
+                requests += 1
+        except Exception as e:
+            # Earlier requests are already written; say how far the batch got
+            prefix = "API error" if isinstance(e, HttpError) else "Error"
+            return {
+                "success": False,
+                "error": f"{prefix}: {str(e)}",
+                "applied_updates": applied,
+                "first_unapplied_index": applied,
+                "total_updated_cells": total_cells,
+                "total_updated_rows": total_rows,
+                "requests": requests
+            }
         
         return {
             "success": True,
-            "total_updated_cells": result.get('totalUpdatedCells'),
-            "total_updated_rows": result.get('totalUpdatedRows'),
-            "responses": len(result.get('responses', [])),
+            "total_updated_cells": total_cells,
+            "total_updated_rows": total_rows,
+            "responses": responses,
+            "requests": len(batches),
             "message": f"Batch update completed with {len(updates)} operations"
         }
     except HttpError as e:
@@ -586,13 +856,7 @@ def format_header_row(spreadsheet_id: str, sheet_name: str, bold: bool = True, b
     """
     try:
         # Get sheet ID
-        spreadsheet = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-        sheet_id = None
-        
-        for sheet in spreadsheet['sheets']:
-            if sheet['properties']['title'] == sheet_name:
-                sheet_id = sheet['properties']['sheetId']
-                break
+        sheet_id = get_sheet_id(spreadsheet_id, sheet_name)
         
         if sheet_id is None:
             return {"success": False, "error": f"Sheet '{sheet_name}' not found"}
@@ -639,7 +903,7 @@ def format_header_row(spreadsheet_id: str, sheet_name: str, bold: bool = True, b
             service.spreadsheets().batchUpdate(
                 spreadsheetId=spreadsheet_id,
                 body={"requests": requests}
-            ).execute()
+            ).execute(num_retries=SHEETS_NUM_RETRIES)
         
         return {
             "success": True,
@@ -670,29 +934,29 @@ def find_in_sheet(spreadsheet_id: str, sheet_name: str, search_text: str, case_s
         List of matches with row, column, and value
     """
     try:
-        result = read_entire_sheet(spreadsheet_id, sheet_name)
+        # Search the text as displayed in the sheet
+        result = read_entire_sheet(spreadsheet_id, sheet_name, "FORMATTED_VALUE")
         
         if not result.get("success"):
             return result
         
         data = result.get("data", [])
+        # Compiled once; matching runs in C with no lower-cased copy of each cell
+        pattern = re.compile(re.escape(search_text), 0 if case_sensitive else re.IGNORECASE)
         matches = []
         
-        for row_idx, row in enumerate(data):
-            for col_idx, cell_value in enumerate(row):
-                cell_str = str(cell_value)
-                search_str = search_text
-                
-                if not case_sensitive:
-                    cell_str = cell_str.lower()
-                    search_str = search_str.lower()
+        for row_idx, row in enumerate(data, start=1):
+            for col_idx, cell_value in enumerate(row, start=1):
+                # FORMATTED_VALUE cells are already strings; empty ones can't match
+                if not cell_value:
+                    continue
                 
-                if search_str in cell_str:
-                    col_letter = chr(65 + col_idx) if col_idx < 26 else f"A{chr(65 + col_idx - 26)}"
+                if pattern.search(cell_value):
+                    col_letter = column_letter(col_idx)
                     matches.append({
-                        "row": row_idx + 1,
+                        "row": row_idx,
                         "column": col_letter,
-                        "cell": f"{col_letter}{row_idx + 1}",
+                        "cell": f"{col_letter}{row_idx}",
                         "value": cell_value
                     })
         
@@ -710,6 +974,12 @@ def find_in_sheet(spreadsheet_id: str, sheet_name: str, search_text: str, case_s
 # ROBOTICS CLUB SPECIFIC TOOLS
 # ======================================================================
 
+def current_date_time() -> Tuple[str, str]:
+    """Returns the local date (YYYY-MM-DD) and time (HH:MM:SS) from one clock read"""
+    now = datetime.now().isoformat(sep=" ", timespec="seconds")
+    return now[:10], now[11:]
+
+
 @mcp.tool()
 def mark_attendance(spreadsheet_id: str, sheet_name: str, member_name: str, status: str = "Present", date: Optional[str] = None, notes: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -727,10 +997,8 @@ def mark_attendance(spreadsheet_id: str, sheet_name: str, member_name: str, stat
         mark_attendance("SHEET_ID", "Attendance", "John Doe", "Present")
     """
     try:
-        if not date:
-            date = datetime.now().strftime("%Y-%m-%d")
-        
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        today, timestamp = current_date_time()
+        date = date or today
         
         row = [member_name, date, status, timestamp]
         if notes:
@@ -746,6 +1014,39 @@ def mark_attendance(spreadsheet_id: str, sheet_name: str, member_name: str, stat
         return {"success": False, "error": f"Error: {str(e)}"}
 
 
+@mcp.tool()
+def mark_attendance_bulk(spreadsheet_id: str, sheet_name: str, member_names: List[str], status: str = "Present", date: Optional[str] = None, notes: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Mark the same attendance status for several members in a single append.
+    
+    Args:
+        spreadsheet_id: Google Sheet ID
+        sheet_name: Sheet name (e.g., "Attendance")
+        member_names: Names of the members
+        status: Present/Absent/Late/Excused
+        date: Date in YYYY-MM-DD format (defaults to today)
+        notes: Optional notes added to every row
+    
+    Example:
+        mark_attendance_bulk("SHEET_ID", "Attendance", ["John Doe", "Jane Roe"], "Present")
+    """
+    try:
+        today, timestamp = current_date_time()
+        date = date or today
+        
+        tail = [date, status, timestamp] + ([notes] if notes else [])
+        rows = [[member_name] + tail for member_name in member_names]
+        
+        result = append_rows(spreadsheet_id, sheet_name, rows)
+        
+        if result.get("success"):
+            result["message"] = f"Attendance marked: {len(rows)} member(s) - {status} on {date}"
+        
+        return result
+    except Exception as e:
+        return {"success": False, "error": f"Error: {str(e)}"}
+
+
 @mcp.tool()
 def add_inventory_item(spreadsheet_id: str, sheet_name: str, item_name: str, quantity: int, category: str, location: Optional[str] = None, notes: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -761,7 +1062,7 @@ def add_inventory_item(spreadsheet_id: str, sheet_name: str, item_name: str, qua
         notes: Additional notes
     """
     try:
-        date_added = datetime.now().strftime("%Y-%m-%d")
+        date_added, _ = current_date_time()
         
         row = [item_name, quantity, category, location or "", date_added]
         if notes:
@@ -792,10 +1093,8 @@ def log_project_activity(spreadsheet_id: str, sheet_name: str, project_name: str
         date: Date (defaults to today)
     """
     try:
-        if not date:
-            date = datetime.now().strftime("%Y-%m-%d")
-        
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        today, timestamp = current_date_time()
+        date = date or today
         
         row = [date, timestamp, project_name, activity, member_name]
         if hours_spent is not None:
@@ -827,41 +1126,63 @@ def setup_robotics_club_spreadsheet(title: str = "Robotics Club Management") ->
         Complete setup information including spreadsheet ID and URL
     """
     try:
-        # Create spreadsheet
-        result = create_spreadsheet(title, ["Attendance", "Inventory", "Project Log", "Members", "Schedule"])
-        
-        if not result.get("success"):
-            return result
-        
-        spreadsheet_id = result["spreadsheet_id"]
-        
-        # Setup Attendance sheet
-        set_headers(spreadsheet_id, "Attendance", ["Member Name", "Date", "Status", "Time", "Notes"])
-        format_header_row(spreadsheet_id, "Attendance", True, {"red": 0.8, "green": 0.9, "blue": 1.0})
-        
-        # Setup Inventory sheet
-        set_headers(spreadsheet_id, "Inventory", ["Item Name", "Quantity", "Category", "Location", "Date Added", "Notes"])
-        format_header_row(spreadsheet_id, "Inventory", True, {"red": 0.9, "green": 1.0, "blue": 0.8})
+        # Sheet name -> (headers, header background color)
+        layout = {
+            "Attendance": (["Member Name", "Date", "Status", "Time", "Notes"], {"red": 0.8, "green": 0.9, "blue": 1.0}),
+            "Inventory": (["Item Name", "Quantity", "Category", "Location", "Date Added", "Notes"], {"red": 0.9, "green": 1.0, "blue": 0.8}),
+            "Project Log": (["Date", "Time", "Project Name", "Activity", "Member Name", "Hours Spent"], {"red": 1.0, "green": 0.9, "blue": 0.8}),
+            "Members": (["Name", "Email", "Phone", "Join Date", "Role", "Status"], {"red": 1.0, "green": 0.8, "blue": 0.9}),
+            "Schedule": (["Date", "Time", "Event", "Location", "Description", "Coordinator"], {"red": 0.9, "green": 0.8, "blue": 1.0})
+        }
         
-        # Setup Project Log sheet
-        set_headers(spreadsheet_id, "Project Log", ["Date", "Time", "Project Name", "Activity", "Member Name", "Hours Spent"])
-        format_header_row(spreadsheet_id, "Project Log", True, {"red": 1.0, "green": 0.9, "blue": 0.8})
+        # Sheets are created with their formatted header rows already filled in,
+        # so the whole setup is a single API call
+        spreadsheet = {
+            "properties": {"title": title},
+            "sheets": [
+                {
+                    "properties": {"title": name},
+                    "data": [{
+                        "startRow": 0,
+                        "startColumn": 0,
+                        "rowData": [{
+                            "values": [
+                                {
+                                    "userEnteredValue": {"stringValue": header},
+                                    "userEnteredFormat": {
+                                        "textFormat": {"bold": True},
+                                        "backgroundColor": color
+                                    }
+                                }
+                                for header in headers
+                            ]
+                        }]
+                    }]
+                }
+                for name, (headers, color) in layout.items()
+            ]
+        }
         
-        # Setup Members sheet
-        set_headers(spreadsheet_id, "Members", ["Name", "Email", "Phone", "Join Date", "Role", "Status"])
-        format_header_row(spreadsheet_id, "Members", True, {"red": 1.0, "green": 0.8, "blue": 0.9})
+        result = execute_once(service.spreadsheets().create(
+            body=spreadsheet,
+            fields="spreadsheetId,spreadsheetUrl,sheets.properties(sheetId,title)"
+        ))
         
-        # Setup Schedule sheet
-        set_headers(spreadsheet_id, "Schedule", ["Date", "Time", "Event", "Location", "Description", "Coordinator"])
-        format_header_row(spreadsheet_id, "Schedule", True, {"red": 0.9, "green": 0.8, "blue": 1.0})
+        spreadsheet_id = result["spreadsheetId"]
+        _sheet_id_cache[spreadsheet_id] = {
+            sheet['properties']['title']: sheet['properties']['sheetId']
+            for sheet in result.get('sheets', [])
+        }
         
         return {
             "success": True,
             "spreadsheet_id": spreadsheet_id,
-            "spreadsheet_url": result["spreadsheet_url"],
-            "sheets_created": ["Attendance", "Inventory", "Project Log", "Members", "Schedule"],
+            "spreadsheet_url": result["spreadsheetUrl"],
+            "sheets_created": list(layout),
             "message": "Robotics club spreadsheet setup complete! All sheets configured with headers."
         }
+    except HttpError as e:
+        return {"success": False, "error": f"API error: {str(e)}"}
     except Exception as e:
         return {"success": False, "error": f"Error during setup: {str(e)}"}
 
@@ -1,24 +1,85 @@
 from mcp.server.fastmcp import FastMCP
-import requests
+import httpx
+import orjson
+import re
 import sys
-import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
+from urllib.parse import quote
 
 # Create MCP server instance
 mcp = FastMCP("search_tools")
 
+DUCKDUCKGO_URL = "https://api.duckduckgo.com/"
+WIKIPEDIA_SUMMARY_URL = "https://en.wikipedia.org/api/rest_v1/page/summary"
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+
+# Wikimedia asks API clients to identify themselves
+HEADERS = {
+    "User-Agent": "MCP-Search-Tools-Server/1.0"
+}
+
+# Shared client so repeat searches reuse one keep-alive connection instead of a
+# new TCP+TLS handshake per call
+session = httpx.Client(
+    headers=HEADERS,
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
+    ),
+    timeout=10.0,
+    follow_redirects=True
+)
+
+# Runs the Wikipedia and DuckDuckGo lookups of web_search side by side
+_search_pool = ThreadPoolExecutor(max_workers=4)
+
+# Recent results keyed on (source, normalized query, ...); lookups for the same
+# query within an hour skip the network
+_search_cache = TTLCache(maxsize=512, ttl=3600)
+_search_cache_lock = threading.Lock()
+
+
+def cached_search(key: tuple, no_cache: bool, lookup) -> str:
+    """Return a cached result for key, or run lookup() and cache it unless it failed"""
+    if not no_cache:
+        with _search_cache_lock:
+            cached = _search_cache.get(key)
+        if cached is not None:
+            return cached
+    
+    result = lookup()
+    if not result.startswith("Error"):
+        with _search_cache_lock:
+            _search_cache[key] = result
+    return result
+
+
+def normalize_query(query: str) -> str:
+    """Collapse case and whitespace so equivalent queries share a cache entry"""
+    return " ".join(query.lower().split())
+
 # ---------------- DuckDuckGo ----------------
 @mcp.tool()
-def DuckDuckGoSearchRun(query: str) -> str:
+def DuckDuckGoSearchRun(query: str, no_cache: bool = False) -> str:
     """
     Performs privacy-focused web searches using DuckDuckGo's API.
     Returns a formatted string of search results with title, URL, and snippet.
+    Set no_cache to skip cached results from the last hour.
     """
+    return cached_search(("duckduckgo", normalize_query(query)), no_cache,
+                         lambda: _duckduckgo_search(query))
+
+
+def _duckduckgo_search(query: str) -> str:
+    """DuckDuckGo instant-answer lookup behind DuckDuckGoSearchRun"""
     try:
-        url = "https://api.duckduckgo.com/"
         params = {"q": query, "format": "json", "no_html": 1, "skip_disambig": 1}
-        resp = requests.get(url, params=params, timeout=10)
+        resp = session.get(DUCKDUCKGO_URL, params=params)
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
 
         results = []
         
@@ -42,50 +103,83 @@ def DuckDuckGoSearchRun(query: str) -> str:
 
 # ---------------- Wikipedia ----------------
 @mcp.tool()
-def WikipediaQueryRun(query: str, sentences: int = 5) -> str:
+def WikipediaQueryRun(query: str, sentences: int = 5, no_cache: bool = False) -> str:
     """
     Searches Wikipedia for a query and returns summary and URL.
     Returns formatted string with title, summary, and URL.
+    Set no_cache to skip cached results from the last hour.
     """
+    return cached_search(("wikipedia", normalize_query(query), sentences), no_cache,
+                         lambda: _wikipedia_search(query, sentences))
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def wikipedia_titles(query: str, limit: int = 5) -> list:
+    """Resolve a free-text query to the closest Wikipedia article titles"""
+    params = {"action": "opensearch", "search": query, "limit": limit, "namespace": 0, "format": "json"}
+    resp = session.get(WIKIPEDIA_API_URL, params=params)
+    resp.raise_for_status()
+    return orjson.loads(resp.content)[1]
+
+
+def wikipedia_summary(title: str):
+    """Fetch an article's REST summary (title, extract, URL) in one request; None if there is no such page"""
+    resp = session.get(f"{WIKIPEDIA_SUMMARY_URL}/{quote(title.replace(' ', '_'), safe='')}")
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    return orjson.loads(resp.content)
+
+
+def _wikipedia_search(query: str, sentences: int) -> str:
+    """Wikipedia summary lookup behind WikipediaQueryRun"""
     try:
-        import wikipedia
+        # Exact titles (and redirects) resolve in a single request; only otherwise
+        # search for the closest title first
+        page = wikipedia_summary(query)
+        if page is None:
+            titles = wikipedia_titles(query, limit=1)
+            page = wikipedia_summary(titles[0]) if titles else None
+        
+        if page is None:
+            return f"❌ No Wikipedia page found for '{query}'. Try a different search term."
         
-        # Set language to English
-        wikipedia.set_lang("en")
+        if page.get("type") == "disambiguation":
+            # Handle disambiguation - return options
+            options = ', '.join(wikipedia_titles(query))
+            return f"⚠️ Multiple results found for '{query}'. Please be more specific. Options: {options}"
         
-        # Search and get summary
-        summary = wikipedia.summary(query, sentences=sentences, auto_suggest=True)
-        page = wikipedia.page(query, auto_suggest=True)
+        summary = " ".join(_SENTENCE_END.split(page.get("extract", ""))[:sentences])
+        url = page.get("content_urls", {}).get("desktop", {}).get("page", "N/A")
         
-        result = f"📖 Wikipedia: {page.title}\n\n{summary}\n\n🔗 Read more: {page.url}"
+        result = f"📖 Wikipedia: {page.get('title', query)}\n\n{summary}\n\n🔗 Read more: {url}"
         return result
     
-    except wikipedia.exceptions.DisambiguationError as e:
-        # Handle disambiguation - return options
-        options = ', '.join(e.options[:5])
-        return f"⚠️ Multiple results found for '{query}'. Please be more specific. Options: {options}"
-    
-    except wikipedia.exceptions.PageError:
-        return f"❌ No Wikipedia page found for '{query}'. Try a different search term."
-    
     except Exception as e:
         return f"Error searching Wikipedia: {str(e)}"
 
 
 # ---------------- Web Search (Alternative) ----------------
 @mcp.tool()
-def web_search(query: str) -> str:
+def web_search(query: str, no_cache: bool = False) -> str:
     """
     General web search that tries Wikipedia first, then DuckDuckGo.
     Best for general queries.
     """
-    # Try Wikipedia first
-    wiki_result = WikipediaQueryRun(query, sentences=3)
+    # Query both at once so a Wikipedia miss doesn't add a second round trip
+    wiki_future = _search_pool.submit(WikipediaQueryRun, query, 3, no_cache)
+    ddg_future = _search_pool.submit(DuckDuckGoSearchRun, query, no_cache)
+    
+    # Prefer Wikipedia
+    wiki_result = wiki_future.result()
     if not wiki_result.startswith("Error") and not wiki_result.startswith("❌"):
+        ddg_future.cancel()
         return wiki_result
     
     # Fall back to DuckDuckGo
-    return DuckDuckGoSearchRun(query)
+    return ddg_future.result()
 
 
 # ---------------- Run MCP Server ----------------
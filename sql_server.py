@@ -1,60 +1,116 @@
 from mcp.server.fastmcp import FastMCP
 import sqlite3
 import os
+import re
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+import time
+import atexit
+from functools import lru_cache
 
 mcp = FastMCP("sqlite-db")
 
 # Database configuration
 DB_PATH = os.getenv("SQLITE_DB_PATH", "./business_data.db")
-conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+# Rows come back as plain tuples (the default factory); column names are sent once per result.
+# sqlite3 reuses compiled statements by SQL text; the larger cache keeps the tools'
+# fixed queries compiled even when clients run many distinct ad-hoc queries
+conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
 
-# Business insights memo storage
-insights_memo = []
+# Connection tuning, applied once: WAL lets readers run alongside a writer and,
+# with synchronous=NORMAL, commits without an fsync each (WAL needs a real file)
+if DB_PATH != ":memory:":
+    conn.execute("PRAGMA journal_mode=WAL")
+conn.execute("PRAGMA synchronous=NORMAL")
+conn.execute("PRAGMA temp_store=MEMORY")
+conn.execute("PRAGMA cache_size=-131072")  # 128 MiB page cache keeps tables hot between calls
+conn.execute("PRAGMA cache_spill=OFF")  # don't evict dirty pages mid-transaction
+conn.execute("PRAGMA mmap_size=1073741824")  # 1 GiB memory-mapped reads, no userspace copy
+conn.execute("PRAGMA busy_timeout=5000")
 
-def execute_query(query: str, params: tuple = ()) -> List[Dict[str, Any]]:
-    """Execute a query and return results"""
+# Refresh planner statistics that have gone stale before the connection closes
+atexit.register(lambda: conn.execute("PRAGMA optimize"))
+
+# Business insights memo storage; kept in the database so it survives restarts,
+# under a prefixed name that can't collide with the user's own tables
+conn.execute("CREATE TABLE IF NOT EXISTS _mcp_insights (id INTEGER PRIMARY KEY, ts TEXT NOT NULL, text TEXT NOT NULL)")
+conn.commit()
+
+# First keyword of a statement, read without copying or uppercasing the whole query
+_FIRST_KW = re.compile(r"\s*([A-Za-z]+)")
+_CREATE_TABLE = re.compile(r"\s*CREATE\s+TABLE\b", re.IGNORECASE)
+WRITE_KEYWORDS = frozenset({"INSERT", "UPDATE", "DELETE"})
+
+
+def database_error(e: Exception) -> Dict[str, str]:
+    """Error response for a failed SQLite operation"""
+    return {"error": f"Database error: {e}"}
+
+
+def unexpected_error(e: Exception) -> Dict[str, str]:
+    """Error response for any other failure inside a tool"""
+    return {"error": f"Unexpected error: {e}"}
+
+
+def first_keyword(query: str) -> str:
+    """Returns the statement's leading keyword in upper case ("" if there is none)"""
+    match = _FIRST_KW.match(query)
+    return match.group(1).upper() if match else ""
+
+
+def execute_query(query: str, params: tuple = (), max_rows: Optional[int] = None) -> Dict[str, Any]:
+    """Execute a query and return results as column names plus row value lists"""
     cursor = conn.cursor()
     cursor.execute(query, params)
     
-    if query.strip().upper().startswith("SELECT"):
-        results = cursor.fetchall()
-        return [dict(row) for row in results]
+    if first_keyword(query) == "SELECT":
+        columns = [column[0] for column in cursor.description]
+        if max_rows is None:
+            return {"columns": columns, "rows": cursor.fetchall(), "truncated": False}
+        if max_rows < 1:
+            raise ValueError("max_rows must be at least 1")
+        
+        # Fetch at most one row past the cap, so a huge result is never fully materialized
+        rows = cursor.fetchmany(max_rows + 1)
+        return {"columns": columns, "rows": rows[:max_rows], "truncated": len(rows) > max_rows}
     else:
         conn.commit()
-        return [{"affected_rows": cursor.rowcount}]
+        return {"affected_rows": cursor.rowcount}
 
 
 @mcp.tool()
-def read_query(query: str) -> Dict[str, Any]:
+def read_query(query: str, max_rows: int = 10000) -> Dict[str, Any]:
     """
     Execute SELECT queries to read data from the database.
     
     Args:
         query: The SELECT SQL query to execute
+        max_rows: Most rows to return (default: 10000); "truncated" is set when more matched
     
     Returns:
-        Dictionary containing query results
+        Dictionary with the result's column names and its rows as value lists
     
     Example:
         read_query("SELECT * FROM customers WHERE age > 25")
     """
     try:
-        if not query.strip().upper().startswith("SELECT"):
+        if first_keyword(query) != "SELECT":
             return {"error": "Only SELECT queries are allowed. Use write_query for modifications."}
         
-        results = execute_query(query)
+        if max_rows < 1:
+            return {"error": "max_rows must be at least 1"}
+        
+        results = execute_query(query, max_rows=max_rows)
         return {
             "success": True,
-            "row_count": len(results),
-            "data": results
+            "row_count": len(results["rows"]),
+            "truncated": results["truncated"],
+            "columns": results["columns"],
+            "rows": results["rows"]
         }
     except sqlite3.Error as e:
-        return {"error": f"Database error: {str(e)}"}
+        return database_error(e)
     except Exception as e:
-        return {"error": f"Unexpected error: {str(e)}"}
+        return unexpected_error(e)
 
 
 @mcp.tool()
@@ -72,11 +128,11 @@ def write_query(query: str) -> Dict[str, Any]:
         write_query("INSERT INTO customers (name, age) VALUES ('John', 30)")
     """
     try:
-        query_upper = query.strip().upper()
-        if query_upper.startswith("SELECT"):
+        keyword = first_keyword(query)
+        if keyword == "SELECT":
             return {"error": "Use read_query for SELECT statements"}
         
-        if not any(query_upper.startswith(cmd) for cmd in ["INSERT", "UPDATE", "DELETE"]):
+        if keyword not in WRITE_KEYWORDS:
             return {"error": "Only INSERT, UPDATE, or DELETE queries allowed"}
         
         cursor = conn.cursor()
@@ -90,10 +146,45 @@ def write_query(query: str) -> Dict[str, Any]:
         }
     except sqlite3.Error as e:
         conn.rollback()
-        return {"error": f"Database error: {str(e)}"}
+        return database_error(e)
     except Exception as e:
         conn.rollback()
-        return {"error": f"Unexpected error: {str(e)}"}
+        return unexpected_error(e)
+
+
+@mcp.tool()
+def write_many(query: str, params_list: List[List[Any]]) -> Dict[str, Any]:
+    """
+    Execute one INSERT, UPDATE, or DELETE query for many parameter sets in a
+    single transaction.
+    
+    Args:
+        query: The SQL modification query with ? placeholders
+        params_list: One list of parameter values per execution
+    
+    Returns:
+        Dictionary with affected rows count
+    
+    Example:
+        write_many("INSERT INTO customers (name, age) VALUES (?, ?)", [["John", 30], ["Jane", 28]])
+    """
+    try:
+        if first_keyword(query) not in WRITE_KEYWORDS:
+            return {"error": "Only INSERT, UPDATE, or DELETE queries allowed"}
+        
+        # All rows commit together, with a single fsync
+        with conn:
+            cursor = conn.executemany(query, params_list)
+        
+        return {
+            "success": True,
+            "affected_rows": cursor.rowcount,
+            "message": f"Successfully modified {cursor.rowcount} row(s)"
+        }
+    except sqlite3.Error as e:
+        return database_error(e)
+    except Exception as e:
+        return unexpected_error(e)
 
 
 @mcp.tool()
@@ -111,7 +202,7 @@ def create_table(query: str) -> Dict[str, Any]:
         create_table("CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)")
     """
     try:
-        if not query.strip().upper().startswith("CREATE TABLE"):
+        if not _CREATE_TABLE.match(query):
             return {"error": "Only CREATE TABLE statements allowed"}
         
         cursor = conn.cursor()
@@ -123,9 +214,45 @@ def create_table(query: str) -> Dict[str, Any]:
             "message": "Table created successfully"
         }
     except sqlite3.Error as e:
-        return {"error": f"Database error: {str(e)}"}
+        return database_error(e)
     except Exception as e:
-        return {"error": f"Unexpected error: {str(e)}"}
+        return unexpected_error(e)
+
+
+def schema_version() -> int:
+    """SQLite's schema cookie; it changes on every CREATE/ALTER/DROP"""
+    return conn.execute("PRAGMA schema_version").fetchone()[0]
+
+
+# Schema lookups are keyed on the schema version, so any DDL invalidates them
+@lru_cache(maxsize=1)
+def _list_tables_cached(version: int) -> List[str]:
+    # Hide the memo table and SQLite's internal ones (sqlite_stat1 from ANALYZE, sqlite_sequence)
+    cursor = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name != '_mcp_insights' "
+        "AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\' ORDER BY name"
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+@lru_cache(maxsize=128)
+def _describe_table_cached(table_name: str, version: int) -> List[Dict[str, Any]]:
+    # Bound parameter: no SQL built from the table name, and one reusable statement
+    cursor = conn.execute(
+        'SELECT cid, name, type, "notnull", dflt_value, pk FROM pragma_table_info(?)',
+        (table_name,)
+    )
+    return [
+        {
+            "column_id": col[0],
+            "name": col[1],
+            "type": col[2],
+            "not_null": bool(col[3]),
+            "default_value": col[4],
+            "primary_key": bool(col[5])
+        }
+        for col in cursor.fetchall()
+    ]
 
 
 @mcp.tool()
@@ -140,9 +267,7 @@ def list_tables() -> Dict[str, Any]:
         list_tables()
     """
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-        tables = [row[0] for row in cursor.fetchall()]
+        tables = _list_tables_cached(schema_version())
         
         return {
             "success": True,
@@ -150,7 +275,7 @@ def list_tables() -> Dict[str, Any]:
             "tables": tables
         }
     except sqlite3.Error as e:
-        return {"error": f"Database error: {str(e)}"}
+        return database_error(e)
 
 
 @mcp.tool()
@@ -168,31 +293,18 @@ def describe_table(table_name: str) -> Dict[str, Any]:
         describe_table("customers")
     """
     try:
-        cursor = conn.cursor()
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = cursor.fetchall()
+        schema = _describe_table_cached(table_name, schema_version())
         
-        if not columns:
+        if not schema:
             return {"error": f"Table '{table_name}' does not exist"}
         
-        schema = []
-        for col in columns:
-            schema.append({
-                "column_id": col[0],
-                "name": col[1],
-                "type": col[2],
-                "not_null": bool(col[3]),
-                "default_value": col[4],
-                "primary_key": bool(col[5])
-            })
-        
         return {
             "success": True,
             "table_name": table_name,
             "columns": schema
         }
     except sqlite3.Error as e:
-        return {"error": f"Database error: {str(e)}"}
+        return database_error(e)
 
 
 @mcp.tool()
@@ -210,17 +322,19 @@ def append_insight(insight: str) -> Dict[str, Any]:
         append_insight("Sales increased 25% in Q4 compared to Q3")
     """
     try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
         insight_entry = {
             "timestamp": timestamp,
             "insight": insight
         }
-        insights_memo.append(insight_entry)
+        with conn:
+            conn.execute("INSERT INTO _mcp_insights (ts, text) VALUES (?, ?)", (timestamp, insight))
+        total_insights = conn.execute("SELECT COUNT(*) FROM _mcp_insights").fetchone()[0]
         
         return {
             "success": True,
             "message": "Insight added successfully",
-            "total_insights": len(insights_memo),
+            "total_insights": total_insights,
             "insight": insight_entry
         }
     except Exception as e:
@@ -239,37 +353,94 @@ def get_insights_memo() -> Dict[str, Any]:
         get_insights_memo()
     """
     try:
-        if not insights_memo:
+        insights = [
+            {"timestamp": timestamp, "insight": text}
+            for timestamp, text in conn.execute("SELECT ts, text FROM _mcp_insights ORDER BY id")
+        ]
+        if not insights:
             return {
                 "success": True,
                 "message": "No insights recorded yet",
                 "insights": []
             }
         
-        memo_text = "BUSINESS INSIGHTS MEMO\n"
-        memo_text += "=" * 50 + "\n\n"
-        
-        for idx, entry in enumerate(insights_memo, 1):
-            memo_text += f"{idx}. [{entry['timestamp']}]\n"
-            memo_text += f"   {entry['insight']}\n\n"
+        # Built in one join rather than by repeated string concatenation
+        memo_text = "BUSINESS INSIGHTS MEMO\n" + "=" * 50 + "\n\n" + "".join(
+            f"{idx}. [{entry['timestamp']}]\n   {entry['insight']}\n\n"
+            for idx, entry in enumerate(insights, 1)
+        )
         
         return {
             "success": True,
-            "total_insights": len(insights_memo),
+            "total_insights": len(insights),
             "memo": memo_text,
-            "insights": insights_memo
+            "insights": insights
         }
     except Exception as e:
         return {"error": f"Error retrieving memo: {str(e)}"}
 
 
+# Sample topics for create_sample_database: schema statements, insert SQL and seed rows
+SAMPLE_TOPICS = {
+    "sales": (
+        [
+            """
+            CREATE TABLE IF NOT EXISTS sales (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                product TEXT NOT NULL,
+                quantity INTEGER NOT NULL,
+                price REAL NOT NULL,
+                sale_date DATE NOT NULL,
+                region TEXT NOT NULL
+            )
+            """,
+            # Covering index for analyze_sales_data's GROUP BY product, region:
+            # rows are read pre-sorted from the index without touching the table
+            "CREATE INDEX IF NOT EXISTS idx_sales_product_region ON sales(product, region, quantity, price)"
+        ],
+        "INSERT INTO sales (product, quantity, price, sale_date, region) VALUES (?, ?, ?, ?, ?)",
+        [
+            ("Laptop", 5, 1200.00, "2024-01-15", "North"),
+            ("Mouse", 20, 25.00, "2024-01-16", "South"),
+            ("Keyboard", 15, 75.00, "2024-01-17", "East"),
+            ("Monitor", 8, 300.00, "2024-01-18", "West"),
+            ("Laptop", 3, 1200.00, "2024-02-10", "North"),
+            ("Mouse", 25, 25.00, "2024-02-11", "South"),
+            ("Headphones", 12, 50.00, "2024-02-12", "East")
+        ]
+    ),
+    "customers": (
+        [
+            """
+            CREATE TABLE IF NOT EXISTS customers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                age INTEGER,
+                city TEXT,
+                signup_date DATE NOT NULL
+            )
+            """
+        ],
+        "INSERT INTO customers (name, email, age, city, signup_date) VALUES (?, ?, ?, ?, ?)",
+        [
+            ("Alice Smith", "alice@email.com", 28, "New York", "2023-06-15"),
+            ("Bob Johnson", "bob@email.com", 35, "Los Angeles", "2023-07-20"),
+            ("Carol White", "carol@email.com", 42, "Chicago", "2023-08-10"),
+            ("David Brown", "david@email.com", 31, "Houston", "2023-09-05"),
+            ("Eve Davis", "eve@email.com", 26, "Phoenix", "2023-10-12")
+        ]
+    )
+}
+
+
 @mcp.tool()
 def create_sample_database(topic: str = "sales") -> Dict[str, Any]:
     """
     Create a sample database with demo data for learning purposes.
     
     Args:
-        topic: Business domain (sales, customers, inventory, employees)
+        topic: Business domain (sales, customers)
     
     Returns:
         Confirmation with details of created tables
@@ -278,64 +449,21 @@ def create_sample_database(topic: str = "sales") -> Dict[str, Any]:
         create_sample_database("sales")
     """
     try:
-        cursor = conn.cursor()
+        sample = SAMPLE_TOPICS.get(topic.lower())
+        if sample is None:
+            return {"error": f"Unknown topic '{topic}'. Available topics: {', '.join(SAMPLE_TOPICS)}"}
         
-        if topic.lower() == "sales":
-            # Create sales table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS sales (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    product TEXT NOT NULL,
-                    quantity INTEGER NOT NULL,
-                    price REAL NOT NULL,
-                    sale_date DATE NOT NULL,
-                    region TEXT NOT NULL
-                )
-            """)
-            
-            # Insert sample data
-            sample_sales = [
-                ("Laptop", 5, 1200.00, "2024-01-15", "North"),
-                ("Mouse", 20, 25.00, "2024-01-16", "South"),
-                ("Keyboard", 15, 75.00, "2024-01-17", "East"),
-                ("Monitor", 8, 300.00, "2024-01-18", "West"),
-                ("Laptop", 3, 1200.00, "2024-02-10", "North"),
-                ("Mouse", 25, 25.00, "2024-02-11", "South"),
-                ("Headphones", 12, 50.00, "2024-02-12", "East")
-            ]
-            
-            cursor.executemany(
-                "INSERT INTO sales (product, quantity, price, sale_date, region) VALUES (?, ?, ?, ?, ?)",
-                sample_sales
-            )
-            
-        elif topic.lower() == "customers":
-            # Create customers table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS customers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    age INTEGER,
-                    city TEXT,
-                    signup_date DATE NOT NULL
-                )
-            """)
-            
-            sample_customers = [
-                ("Alice Smith", "alice@email.com", 28, "New York", "2023-06-15"),
-                ("Bob Johnson", "bob@email.com", 35, "Los Angeles", "2023-07-20"),
-                ("Carol White", "carol@email.com", 42, "Chicago", "2023-08-10"),
-                ("David Brown", "david@email.com", 31, "Houston", "2023-09-05"),
-                ("Eve Davis", "eve@email.com", 26, "Phoenix", "2023-10-12")
-            ]
-            
-            cursor.executemany(
-                "INSERT INTO customers (name, email, age, city, signup_date) VALUES (?, ?, ?, ?, ?)",
-                sample_customers
-            )
+        statements, insert_sql, rows = sample
+        cursor = conn.cursor()
         
-        conn.commit()
+        # Table creation and seed rows commit together, with a single fsync
+        with conn:
+            cursor.execute("BEGIN IMMEDIATE")
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.executemany(insert_sql, rows)
+            # Planner statistics for the new table and its indexes
+            cursor.execute(f"ANALYZE {topic.lower()}")
         
         return {
             "success": True,
@@ -349,7 +477,7 @@ def create_sample_database(topic: str = "sales") -> Dict[str, Any]:
         }
     except sqlite3.Error as e:
         conn.rollback()
-        return {"error": f"Database error: {str(e)}"}
+        return database_error(e)
 
 
 @mcp.tool()
@@ -366,39 +494,44 @@ def analyze_sales_data() -> Dict[str, Any]:
     try:
         cursor = conn.cursor()
         
-        # Check if sales table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='sales'")
-        if not cursor.fetchone():
-            return {"error": "Sales table not found. Create sample database first using create_sample_database('sales')"}
+        # One scan of sales: revenue per (product, region); the totals below are
+        # rolled up from these few rows instead of re-scanning the table per question.
+        # A missing table surfaces as the query's own error, so there is no existence probe
+        try:
+            cursor.execute("""
+                SELECT product, region, SUM(quantity) as total_qty, SUM(quantity * price) as revenue
+                FROM sales
+                GROUP BY product, region
+            """)
+        except sqlite3.OperationalError as e:
+            if "no such table" in str(e):
+                return {"error": "Sales table not found. Create sample database first using create_sample_database('sales')"}
+            raise
+        groups = cursor.fetchall()
+        if not groups:
+            return {"error": "Sales table is empty. Add sales data before analyzing."}
+        
+        product_totals = {}
+        region_revenue = {}
+        for product, region, qty, revenue in groups:
+            totals = product_totals.setdefault(product, [0, 0.0])
+            totals[0] += qty
+            totals[1] += revenue
+            region_revenue[region] = region_revenue.get(region, 0.0) + revenue
         
         insights = []
         
         # Analysis 1: Total revenue
-        cursor.execute("SELECT SUM(quantity * price) as total_revenue FROM sales")
-        total_revenue = cursor.fetchone()[0]
+        total_revenue = sum(region_revenue.values())
         insights.append(f"Total revenue across all sales: ${total_revenue:,.2f}")
         
         # Analysis 2: Best selling product
-        cursor.execute("""
-            SELECT product, SUM(quantity) as total_qty, SUM(quantity * price) as revenue
-            FROM sales 
-            GROUP BY product 
-            ORDER BY revenue DESC 
-            LIMIT 1
-        """)
-        best_product = cursor.fetchone()
-        insights.append(f"Best selling product: {best_product[0]} with {best_product[1]} units sold (${best_product[2]:,.2f} revenue)")
+        best_product, (best_qty, best_revenue) = max(product_totals.items(), key=lambda item: item[1][1])
+        insights.append(f"Best selling product: {best_product} with {best_qty} units sold (${best_revenue:,.2f} revenue)")
         
         # Analysis 3: Top region
-        cursor.execute("""
-            SELECT region, SUM(quantity * price) as revenue
-            FROM sales 
-            GROUP BY region 
-            ORDER BY revenue DESC 
-            LIMIT 1
-        """)
-        top_region = cursor.fetchone()
-        insights.append(f"Highest revenue region: {top_region[0]} with ${top_region[1]:,.2f}")
+        top_region, top_revenue = max(region_revenue.items(), key=lambda item: item[1])
+        insights.append(f"Highest revenue region: {top_region} with ${top_revenue:,.2f}")
         
         # Auto-append insights to memo
         for insight in insights:
@@ -412,7 +545,7 @@ def analyze_sales_data() -> Dict[str, Any]:
             "message": "Analysis complete! Insights have been added to the memo."
         }
     except sqlite3.Error as e:
-        return {"error": f"Database error: {str(e)}"}
+        return database_error(e)
 
 
 if __name__ == "__main__":